@@ -0,0 +1,104 @@
+"""
+Show how Silver/Gold cost scales with the number of simulator runs on
+local Spark. Each run appends one telemetry batch to bronze, then:
+
+    full         rebuilds Silver/Gold from all of bronze (BRONZE_MODE=full)
+    incremental  appends only the new bronze rows through a checkpointed stream,
+                 as the notebook does by default
+
+After the runs, the Gold file count and a pruned query (one date, one unit)
+are measured before and after compaction.py merges the small files.
+
+    python -m benchmarks.bench_layout --runs 8 --units 50
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from pyspark.sql import SparkSession
+from pyspark.sql import functions as F
+
+from data_simulator.simulate_telemetry import generate_telemetry
+from notebooks.databricks_ingestion.compaction import compact_table
+from notebooks.databricks_ingestion.layer_transforms import CLUSTER_COLUMNS, write_silver_and_gold
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def pruned_query_seconds(spark, table, repeat=3):
+    row = spark.read.table(table).select("date", "unit_id").orderBy(F.col("date").desc()).first()
+    query = spark.read.table(table).filter((F.col("date") == row["date"]) & (F.col("unit_id") == row["unit_id"]))
+    return min(timed(lambda: query.agg(F.avg("temperature")).collect()) for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full vs incremental Silver/Gold and compaction.")
+    parser.add_argument("--runs", type=int, default=8)
+    parser.add_argument("--units", type=int, default=50)
+    parser.add_argument("--records", type=int, default=1440, help="Readings per unit per run")
+    parser.add_argument("--buckets", type=int, default=8)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_layout_")
+    spark = (
+        SparkSession.builder.master("local[*]")
+        .appName("bench_layout")
+        .config("spark.sql.warehouse.dir", os.path.join(workdir, "warehouse"))
+        .config("spark.ui.enabled", "false")
+        .getOrCreate()
+    )
+    spark.sparkContext.setLogLevel("ERROR")
+    layout = {"cluster_by": CLUSTER_COLUMNS["telemetry"], "buckets": args.buckets}
+
+    def append_new_rows(batch_df, batch_id):
+        write_silver_and_gold(
+            batch_df, "inc_silver", "inc_gold", mode="overwrite" if batch_id == 0 else "append", **layout
+        )
+
+    def incremental():
+        query = (
+            spark.readStream.table("telemetry_bronze")
+            .writeStream.foreachBatch(append_new_rows)
+            .option("checkpointLocation", os.path.join(workdir, "checkpoint"))
+            .trigger(availableNow=True)
+            .start()
+        )
+        query.awaitTermination()
+
+    try:
+        print(f"{'run':>4} {'bronze rows':>12} {'full s':>8} {'incremental s':>14}")
+        for run in range(1, args.runs + 1):
+            pdf = generate_telemetry(args.units, args.records, seed=run)
+            pdf["unit_id"] = pdf["unit_id"].astype(str)
+            spark.createDataFrame(pdf).write.mode("append").saveAsTable("telemetry_bronze")
+
+            full_s = timed(
+                lambda: write_silver_and_gold(
+                    spark.read.table("telemetry_bronze"), "full_silver", "full_gold", **layout
+                )
+            )
+            incremental_s = timed(incremental)
+            print(f"{run:>4} {spark.read.table('telemetry_bronze').count():>12,} {full_s:>8.2f} {incremental_s:>14.2f}")
+
+        before_files = len(spark.read.table("inc_gold").inputFiles())
+        before_s = pruned_query_seconds(spark, "inc_gold")
+        compaction_s = timed(lambda: compact_table(spark, "inc_gold", cluster_by="unit_id", buckets=args.buckets))
+        after_files = len(spark.read.table("inc_gold").inputFiles())
+        after_s = pruned_query_seconds(spark, "inc_gold")
+        print(f"\nincremental gold: {before_files} files -> {after_files} after compaction ({compaction_s:.2f}s)")
+        print(f"pruned query (one date, one unit): {before_s:.3f}s -> {after_s:.3f}s")
+        assert spark.read.table("inc_gold").count() == spark.read.table("full_gold").count()
+    finally:
+        spark.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Latency and throughput of the two scoring paths for the telemetry fault
+model: Spark (model_scoring.score, as used by the batch and foreachBatch
+paths) and the NumPy local scorer over the exported forest.
+
+With local Spark, trains a forest on fleet-simulator features, exports it,
+checks the local scorer agrees with Spark row for row, then times both:
+    python -m benchmarks.bench_scoring --units 200 --steps 1440
+
+Local scorer only, from a forest exported by the notebook:
+    python -m benchmarks.bench_scoring --forest telemetry_rf_trees.json
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from data_simulator.simulate_fleet import generate_fleet
+from notebooks.databricks_ingestion.local_scorer import ForestArrays, load_forest, save_forest, telemetry_features
+
+BATCH_SIZES = [1, 100, 10_000]
+
+
+def latency(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2], timings[int(0.99 * (len(timings) - 1))]
+
+
+def train_with_spark(frames, num_trees, max_depth, repeat):
+    from pyspark.sql import SparkSession
+    from pyspark.ml.classification import RandomForestClassifier
+    from pyspark.ml.feature import VectorAssembler
+    from notebooks.databricks_ingestion.feature_engineering import FEATURE_COLUMNS
+    from notebooks.databricks_ingestion.feature_engineering import telemetry_features as spark_features
+    from notebooks.databricks_ingestion.model_scoring import export_forest, score
+
+    spark = SparkSession.builder.master("local[*]").appName("bench_scoring").getOrCreate()
+
+    def to_spark(pdf):
+        pdf = pdf.copy()
+        for name in pdf.select_dtypes("category"):
+            pdf[name] = pdf[name].astype(str)
+        pdf["timestamp"] = pdf["timestamp"].astype("datetime64[us]")
+        return spark.createDataFrame(pdf)
+
+    features = spark_features(to_spark(frames["telemetry"]), to_spark(frames["maintenance"])).cache()
+    n_rows = features.count()
+    assembled = VectorAssembler(inputCols=FEATURE_COLUMNS, outputCol="features").transform(features)
+    model = RandomForestClassifier(labelCol="fault_code", numTrees=num_trees, maxDepth=max_depth, seed=0).fit(assembled)
+    forest = export_forest(model, FEATURE_COLUMNS)
+
+    predictions = score(model, features, FEATURE_COLUMNS)
+    start = time.perf_counter()
+    predictions.write.format("noop").mode("overwrite").save()
+    elapsed = time.perf_counter() - start
+    print(f"{'spark':<8} {'all':>8} {n_rows / elapsed:>14,.0f} {'-':>10} {'-':>10}")
+    for size in BATCH_SIZES[:2]:
+        batch = features.limit(size).cache()
+        batch.count()
+        p50, p99 = latency(lambda: score(model, batch, FEATURE_COLUMNS).collect(), repeat)
+        print(f"{'spark':<8} {size:>8} {size / p50:>14,.0f} {p50 * 1000:>10.2f} {p99 * 1000:>10.2f}")
+
+    # Spark and the local scorer must agree on the same feature rows
+    sample = features.limit(50_000).toPandas()
+    spark_pred = score(model, features.limit(50_000), FEATURE_COLUMNS).toPandas()
+    local_pred = ForestArrays(forest).predict_proba(sample[FEATURE_COLUMNS].to_numpy()).argmax(axis=1)
+    merged = sample[["unit_id", "timestamp"]].assign(local=local_pred).merge(spark_pred, on=["unit_id", "timestamp"])
+    agreement = (merged["local"] == merged["predicted_fault_code"]).mean()
+    print(f"🔎 local vs spark prediction agreement: {agreement:.4%} over {len(merged):,} rows")
+    spark.stop()
+    return forest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Spark and local NumPy scoring of the fault model.")
+    parser.add_argument("--units", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=1440)
+    parser.add_argument("--forest", default=None, help="Exported forest JSON; skips Spark entirely")
+    parser.add_argument("--save-forest", default=None, help="Write the forest trained here to this path")
+    parser.add_argument("--num-trees", type=int, default=10)
+    parser.add_argument("--max-depth", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    frames = generate_fleet(args.units, args.steps, seed=0)
+    print(f"{'scorer':<8} {'batch':>8} {'rows/s':>14} {'p50 ms':>10} {'p99 ms':>10}")
+    if args.forest:
+        forest = load_forest(args.forest)
+    else:
+        forest = train_with_spark(frames, args.num_trees, args.max_depth, args.repeat)
+        if args.save_forest:
+            save_forest(forest, args.save_forest)
+
+    start = time.perf_counter()
+    features = telemetry_features(frames["telemetry"], frames["maintenance"])
+    feature_s = time.perf_counter() - start
+
+    arrays = ForestArrays(forest)
+    X = features[arrays.feature_names].to_numpy()
+    start = time.perf_counter()
+    arrays.predict_proba(X)
+    elapsed = time.perf_counter() - start
+    print(f"{'local':<8} {'all':>8} {len(X) / elapsed:>14,.0f} {'-':>10} {'-':>10}")
+    for size in BATCH_SIZES:
+        batch = X[np.random.default_rng(0).integers(0, len(X), size)]
+        p50, p99 = latency(lambda: arrays.predict_proba(batch), args.repeat)
+        print(f"{'local':<8} {size:>8} {size / p50:>14,.0f} {p50 * 1000:>10.2f} {p99 * 1000:>10.2f}")
+    print(f"🧮 pandas features for {len(X):,} rows: {feature_s:.2f}s ({len(X) / feature_s:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
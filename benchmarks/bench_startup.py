@@ -0,0 +1,90 @@
+"""
+Measure CLI startup: wall time of `simulate_domain_cli.py --help` and the
+import time of the modules entry points load first, each in a fresh
+interpreter. Also reports which heavy dependencies an import drags in, so
+a stray top-level `import pandas` (or the Azure SDK) shows up here before
+it shows up as a slow --help.
+
+    python -m benchmarks.bench_startup --repeat 10 --budget-ms 250
+
+Exits non-zero if --help is slower than the budget.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(REPO_ROOT, "simulate_domain_cli.py")
+
+MODULES = [
+    "simulate_domain_cli",
+    "data_simulator.writers",
+    "data_simulator.simulate_telemetry",
+    "devops.terraform.utils.blob_uploader",
+    "devops.terraform.utils.blob_initializer",
+]
+HEAVY = ["pandas", "numpy", "pyarrow", "azure", "requests"]
+DEFAULT_BUDGET_MS = 250
+
+
+def best_run_ms(command, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_ROOT, check=True, stdout=subprocess.DEVNULL)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def heavy_imports(module):
+    # Top-level packages from HEAVY that importing module loads
+    code = f"import sys, {module}; print(' '.join(m for m in {HEAVY!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True, capture_output=True, text=True)
+    return out.stdout.split()
+
+
+def measure(repeat):
+    # Baseline interpreter start, then --help and each import; the import rows exclude the baseline
+    baseline = best_run_ms([sys.executable, "-c", "pass"], repeat)
+    results = {
+        "interpreter": {"ms": baseline, "heavy": []},
+        "cli --help": {
+            "ms": best_run_ms([sys.executable, CLI, "--help"], repeat),
+            "heavy": heavy_imports("simulate_domain_cli"),
+        },
+    }
+    for module in MODULES:
+        ms = best_run_ms([sys.executable, "-c", f"import {module}"], repeat) - baseline
+        results[f"import {module}"] = {"ms": ms, "heavy": heavy_imports(module)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CLI startup and module import times.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help="Fail if simulate_domain_cli.py --help takes longer than this",
+    )
+    args = parser.parse_args()
+
+    results = measure(args.repeat)
+    for name, entry in results.items():
+        heavy = ", ".join(entry["heavy"]) or "-"
+        print(f"{name:<48} {entry['ms']:>8.1f} ms   loads: {heavy}")
+
+    help_ms = results["cli --help"]["ms"]
+    if help_ms > args.budget_ms:
+        print(f"❌ --help took {help_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+    print(f"✅ --help took {help_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare rows/sec of the vectorized telemetry generator against the
+original per-unit, per-row implementation.
+
+Run from the repository root:
+    python -m benchmarks.bench_telemetry --units 5000 --records 1440
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from data_simulator.simulate_telemetry import generate_telemetry
+
+
+def legacy_generate_telemetry(n_units=10, n_records_per_unit=1440):
+    # Verbatim copy of the original implementation, kept only as a baseline
+    start_time = datetime.now() - timedelta(days=1)
+
+    def simulate_unit_data(unit_id):
+        timestamps = [start_time + timedelta(minutes=i) for i in range(n_records_per_unit)]
+        temperature = np.random.normal(loc=75, scale=5, size=n_records_per_unit)
+        vibration = np.random.normal(loc=50, scale=10, size=n_records_per_unit)
+        power_draw = np.random.normal(loc=120, scale=15, size=n_records_per_unit)
+
+        fault_code = []
+        for t, v in zip(temperature, vibration):
+            if t > 90 or v > 80:
+                fault_code.append(2)
+            elif t > 85 or v > 70:
+                fault_code.append(1)
+            else:
+                fault_code.append(0)
+
+        return pd.DataFrame(
+            {
+                "unit_id": unit_id,
+                "timestamp": timestamps,
+                "temperature": temperature.round(2),
+                "vibration": vibration.round(2),
+                "power_draw": power_draw.round(2),
+                "fault_code": fault_code,
+            }
+        )
+
+    return pd.concat([simulate_unit_data(f"TU_{i}") for i in range(1, n_units + 1)], ignore_index=True)
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = fn()
+        timings.append(time.perf_counter() - start)
+    return len(df), min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark telemetry generation throughput.")
+    parser.add_argument("--units", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--records", type=int, default=1440, help="Records per unit")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy", action="store_true", help="Only time the vectorized generator")
+    args = parser.parse_args()
+
+    print(f"{'units':>8} {'rows':>12} {'legacy rows/s':>15} {'vector rows/s':>15} {'speedup':>8}")
+    for n_units in args.units:
+        rows, vector_s = best_of(lambda: generate_telemetry(n_units, args.records, seed=0), args.repeat)
+        if args.skip_legacy:
+            legacy_rate, speedup = "-", "-"
+        else:
+            _, legacy_s = best_of(lambda: legacy_generate_telemetry(n_units, args.records), args.repeat)
+            legacy_rate, speedup = f"{rows / legacy_s:,.0f}", f"{legacy_s / vector_s:.1f}x"
+        print(f"{n_units:>8} {rows:>12,} {legacy_rate:>15} {rows / vector_s:>15,.0f} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Measure upload throughput of BlobUploader at several concurrency levels.
+
+Runs offline against LocalBlobBackend by default; --latency-ms adds a fixed
+per-request delay to approximate network round trips. Pass --conn-str to
+target Azurite or a real account instead.
+
+    python -m benchmarks.bench_upload --files 200 --size-kb 256 --concurrency 1 4 16
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from devops.terraform.utils.blob_uploader import AzureBlobBackend, BlobUploader, LocalBlobBackend
+
+
+class DelayedLocalBackend(LocalBlobBackend):
+    def __init__(self, root, latency_s):
+        super().__init__(root)
+        self.latency_s = latency_s
+
+    def upload(self, blob_path, local_path, max_concurrency=1, metadata=None):
+        time.sleep(self.latency_s)
+        return super().upload(blob_path, local_path, max_concurrency, metadata)
+
+    def stage_block(self, blob_path, block_id, data):
+        time.sleep(self.latency_s)
+        return super().stage_block(blob_path, block_id, data)
+
+
+def make_files(folder, n_files, size_bytes):
+    # Mirrors the landing layout so blob paths look like production ones
+    domain_dir = os.path.join(folder, "landing", "2025", "06", "02", "telemetry")
+    os.makedirs(domain_dir, exist_ok=True)
+    payload = os.urandom(size_bytes)
+    paths = []
+    for i in range(n_files):
+        path = os.path.join(domain_dir, f"telemetry_bench_{i}.json")
+        with open(path, "wb") as f:
+            f.write(payload)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark blob upload throughput.")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated round trip for the local backend")
+    parser.add_argument("--conn-str", default=None, help="Azure/Azurite connection string (skips the local backend)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_upload_")
+    try:
+        paths = make_files(workdir, args.files, args.size_kb * 1024)
+        total_mb = args.files * args.size_kb / 1024
+        print(f"{'concurrency':>11} {'seconds':>9} {'files/s':>9} {'MB/s':>8}")
+        for concurrency in args.concurrency:
+            if args.conn_str:
+                backend = AzureBlobBackend(args.conn_str, max_connections=concurrency)
+            else:
+                target = os.path.join(workdir, f"blobs_{concurrency}")
+                backend = DelayedLocalBackend(target, args.latency_ms / 1000)
+            with BlobUploader(backend, max_concurrency=concurrency) as uploader:
+                # Distinct layer per run so a real container never reports "exists"
+                start = time.perf_counter()
+                uploader.upload_many((path, f"bench-c{concurrency}", "telemetry") for path in paths)
+                seconds = time.perf_counter() - start
+            print(f"{concurrency:>11} {seconds:>9.2f} {args.files / seconds:>9.1f} {total_mb / seconds:>8.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+End-to-end benchmark suite with machine-readable results, so runs can be
+compared across commits. Runs offline: uploads go to a local blob stand-in
+with a simulated round trip, ingestion uses local Spark (skipped if
+pyspark is not installed).
+
+Suites:
+    generation  rows/s and peak traced memory per generator at several scales
+    formats     write throughput (rows/s, output MB/s) and file size per format
+    upload      files/s and MB/s at several upload concurrencies
+    ingestion   bronze -> silver -> gold seconds per domain on local Spark
+
+    python -m benchmarks.suite --output bench_results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.suite --suites generation formats --compare bench_results/<baseline>.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from data_simulator.simulate_telemetry import generate_telemetry
+from data_simulator.simulate_maintenance_logs import generate_maintenance_logs
+from data_simulator.simulate_vehicle_usage import generate_vehicle_usage
+from data_simulator.simulate_weather import generate_weather
+from data_simulator.simulate_energy_costs import generate_energy_costs
+from data_simulator.writers import FORMATS, write_chunks
+from devops.terraform.utils.blob_uploader import BlobUploader
+from benchmarks.bench_upload import DelayedLocalBackend, make_files
+
+SUITES = ["generation", "formats", "upload", "ingestion"]
+
+# Each generator at scale 1 is its CLI default size; larger scales multiply the size argument
+GENERATORS = {
+    "telemetry": lambda scale: generate_telemetry(n_units=10 * scale, seed=0),
+    "maintenance": lambda scale: generate_maintenance_logs(n_logs=100 * scale, seed=0),
+    "vehicle_usage": lambda scale: generate_vehicle_usage(n_records=300 * scale, seed=0),
+    "weather": lambda scale: generate_weather(n_records=1440 * scale, seed=0),
+    "energy_costs": lambda scale: generate_energy_costs(n_records=168 * scale, seed=0),
+}
+
+
+def result(suite, name, params, **metrics):
+    return {"suite": suite, "name": name, "params": params, "metrics": metrics}
+
+
+def best_of(fn, repeat):
+    best, value = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return value, best
+
+
+def bench_generation(scales, repeat):
+    results = []
+    for name, generate in GENERATORS.items():
+        for scale in scales:
+            df, seconds = best_of(lambda: generate(scale), repeat)
+            # Separate traced run: tracemalloc slows allocation, so it never overlaps the timed ones
+            tracemalloc.start()
+            generate(scale)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results.append(
+                result(
+                    "generation",
+                    name,
+                    {"scale": scale},
+                    rows=len(df),
+                    seconds=seconds,
+                    rows_per_s=len(df) / seconds,
+                    peak_mb=peak / 2**20,
+                )
+            )
+    return results
+
+
+def bench_formats(workdir, units, repeat):
+    df = generate_telemetry(n_units=units, seed=0)
+    results = []
+    for fmt, ext in FORMATS.items():
+        path = os.path.join(workdir, f"telemetry_bench{ext}")
+        try:
+            _, seconds = best_of(lambda: write_chunks([df], path, fmt, "telemetry"), repeat)
+        except ImportError as e:
+            print(f"⚠️ Skipping {fmt}: {e}")
+            continue
+        size = os.path.getsize(path)
+        results.append(
+            result(
+                "formats",
+                fmt,
+                {"rows": len(df)},
+                seconds=seconds,
+                rows_per_s=len(df) / seconds,
+                mb_per_s=size / 2**20 / seconds,
+                file_mb=size / 2**20,
+            )
+        )
+        os.remove(path)
+    return results
+
+
+def bench_upload(workdir, n_files, size_kb, concurrencies, latency_ms):
+    paths = make_files(workdir, n_files, size_kb * 1024)
+    results = []
+    for concurrency in concurrencies:
+        backend = DelayedLocalBackend(os.path.join(workdir, f"blobs_{concurrency}"), latency_ms / 1000)
+        with BlobUploader(backend, max_concurrency=concurrency) as uploader:
+            start = time.perf_counter()
+            uploader.upload_many((path, "bronze", "telemetry") for path in paths)
+            seconds = time.perf_counter() - start
+        results.append(
+            result(
+                "upload",
+                "local",
+                {"concurrency": concurrency, "files": n_files, "size_kb": size_kb, "latency_ms": latency_ms},
+                seconds=seconds,
+                files_per_s=n_files / seconds,
+                mb_per_s=n_files * size_kb / 1024 / seconds,
+            )
+        )
+    return results
+
+
+def bench_ingestion(workdir, scale):
+    try:
+        from pyspark.sql import SparkSession
+    except ImportError:
+        print("⚠️ Skipping ingestion: pyspark is not installed")
+        return []
+    from notebooks.databricks_ingestion.layer_transforms import write_silver_and_gold
+
+    spark = (
+        SparkSession.builder.master("local[*]")
+        .appName("bench_suite")
+        .config("spark.sql.warehouse.dir", os.path.join(workdir, "warehouse"))
+        .config("spark.ui.enabled", "false")
+        .getOrCreate()
+    )
+    spark.sparkContext.setLogLevel("ERROR")
+
+    def ingest(name, df):
+        path = os.path.join(workdir, "landing", name, f"{name}_bench.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_chunks([df], path, "ndjson", name)
+
+        timings = {}
+        start = time.perf_counter()
+        spark.read.json(path).write.mode("overwrite").saveAsTable(f"{name}_bronze")
+        timings["bronze"] = time.perf_counter() - start
+        write_silver_and_gold(spark.read.table(f"{name}_bronze"), f"{name}_silver", f"{name}_gold", timings=timings)
+        return timings
+
+    results = []
+    try:
+        # Untimed pass so JVM and JSON reader warm-up isn't charged to whichever domain runs first
+        ingest("warmup", GENERATORS["weather"](1))
+        for name, generate in GENERATORS.items():
+            df = generate(scale)
+            timings = ingest(name, df)
+            results.append(
+                result(
+                    "ingestion",
+                    name,
+                    {"scale": scale, "rows": len(df)},
+                    total_s=sum(timings.values()),
+                    **{f"{stage}_s": s for stage, s in timings.items()},
+                )
+            )
+    finally:
+        spark.stop()
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def result_key(entry):
+    return entry["suite"], entry["name"], json.dumps(entry["params"], sort_keys=True)
+
+
+def compare(baseline, current):
+    # Side-by-side of every metric present in both runs; a ratio > 1 means the number went up
+    previous = {result_key(entry): entry["metrics"] for entry in baseline["results"]}
+    print(f"\n🔁 Compared with {baseline['environment'].get('commit')}")
+    print(f"{'suite':<11} {'name':<14} {'params':<40} {'metric':<12} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for entry in current["results"]:
+        old = previous.get(result_key(entry))
+        if old is None:
+            continue
+        for metric, value in entry["metrics"].items():
+            if metric in old and isinstance(value, (int, float)) and old[metric]:
+                print(
+                    f"{entry['suite']:<11} {entry['name']:<14} {json.dumps(entry['params'])[:40]:<40} "
+                    f"{metric:<12} {old[metric]:>12.3f} {value:>12.3f} {value / old[metric]:>7.2f}"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the end-to-end benchmark suite.")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=SUITES)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="Generator size multipliers")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--format-units", type=int, default=100, help="Telemetry units written per format")
+    parser.add_argument("--upload-files", type=int, default=100)
+    parser.add_argument("--upload-size-kb", type=int, default=256)
+    parser.add_argument("--upload-concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated blob round trip")
+    parser.add_argument("--ingestion-scale", type=int, default=10)
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    report = {"environment": environment(), "results": []}
+    workdir = tempfile.mkdtemp(prefix="bench_suite_")
+    try:
+        for suite in args.suites:
+            print(f"⏱️ Running {suite} benchmarks...")
+            if suite == "generation":
+                report["results"] += bench_generation(args.scales, args.repeat)
+            elif suite == "formats":
+                report["results"] += bench_formats(workdir, args.format_units, args.repeat)
+            elif suite == "upload":
+                report["results"] += bench_upload(
+                    workdir, args.upload_files, args.upload_size_kb, args.upload_concurrency, args.latency_ms
+                )
+            elif suite == "ingestion":
+                report["results"] += bench_ingestion(workdir, args.ingestion_scale)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for entry in report["results"]:
+        metrics = "  ".join(
+            f"{k}={v:,.3f}" if isinstance(v, float) else f"{k}={v}" for k, v in entry["metrics"].items()
+        )
+        print(f"{entry['suite']:<11} {entry['name']:<14} {json.dumps(entry['params']):<40} {metrics}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Results saved: {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
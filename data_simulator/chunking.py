@@ -0,0 +1,19 @@
+import pandas as pd
+
+# Default chunk size for streaming generation, in rows
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def steps_per_chunk(n_steps, chunk_size=None, window=None, freq=None, rows_per_step=1):
+    # A chunk is either a row budget or a time window; both resolve to a number of time steps
+    if window is not None:
+        return max(1, int(pd.Timedelta(window) // pd.Timedelta(freq)))
+    if chunk_size is None:
+        return max(1, n_steps)
+    return max(1, chunk_size // rows_per_step)
+
+
+def chunk_bounds(n_steps, step):
+    # No steps still gives one empty chunk, so an unchunked generate_* call returns an empty frame, not nothing
+    for start in range(0, max(n_steps, 1), step):
+        yield start, min(start + step, n_steps)
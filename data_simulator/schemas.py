@@ -0,0 +1,76 @@
+import pandas as pd
+
+# Landing-zone column types per domain. "timestamp" columns are parsed from ISO strings if needed.
+SCHEMAS = {
+    "telemetry": {
+        "unit_id": "category",
+        "timestamp": "timestamp",
+        "temperature": "float32",
+        "vibration": "float32",
+        "power_draw": "float32",
+        "energy_cost": "float32",  # fleet simulation only
+        "fault_code": "int8",
+    },
+    "maintenance": {
+        "unit_id": "category",
+        "timestamp": "timestamp",
+        "fault_code": "int8",
+        "description": "category",
+        "technician": "category",
+    },
+    "vehicle_usage": {
+        "unit_id": "category",
+        "timestamp": "timestamp",
+        "route": "category",
+        "usage_hours": "float32",
+        "status": "category",
+    },
+    "weather": {
+        "timestamp": "timestamp",
+        "temperature_C": "float32",
+        "humidity_%": "float32",
+        "wind_speed_kmh": "float32",
+        "precip_mm": "float32",
+    },
+    "energy_costs": {
+        "timestamp": "timestamp",
+        "provider": "category",
+        "cost_per_kwh": "float32",
+    },
+}
+
+
+def apply_schema(df, domain, narrow_floats=True):
+    # Text formats keep float64: float32 gains nothing there and prints 75.23 as 75.2300033569
+    schema = SCHEMAS.get(domain)
+    if schema is None:
+        return df
+
+    casts = {}
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        if dtype == "timestamp":
+            values = df[column]
+            if not pd.api.types.is_datetime64_any_dtype(values):
+                values = pd.to_datetime(values, format="ISO8601")
+            casts[column] = values.astype("datetime64[ms]")
+        elif dtype == "float32" and not narrow_floats:
+            continue
+        elif df[column].dtype != dtype:
+            casts[column] = df[column].astype(dtype)
+    return df.assign(**casts) if casts else df
+
+
+# Spark type per landing dtype, as each file format stores it. JSON carries numbers as plain JSON numbers
+# (DOUBLE/BIGINT, what Spark's own inference picked) and timestamps as ISO strings; Parquet keeps the narrow types.
+SPARK_TYPES = {
+    "json": {"category": "STRING", "float32": "DOUBLE", "int8": "BIGINT", "timestamp": "STRING"},
+    "parquet": {"category": "STRING", "float32": "FLOAT", "int8": "TINYINT", "timestamp": "TIMESTAMP_NTZ"},
+}
+
+
+def spark_ddl(domain, file_format="json"):
+    # Landing schema as a Spark DDL string ("`unit_id` STRING, ..."), for DataFrameReader/DataStreamReader.schema()
+    types = SPARK_TYPES[file_format]
+    return ", ".join(f"`{column}` {types[dtype]}" for column, dtype in SCHEMAS[domain].items())
@@ -1,24 +1,47 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
 import os
-from devops.terraform.utils.blob_uploader import upload_to_blob
+import argparse
+import logging
+from data_simulator.writers import FORMATS, output_filename, write_chunks
+from data_simulator.chunking import DEFAULT_CHUNK_SIZE, steps_per_chunk, chunk_bounds
+from devops.terraform.utils.instrumentation import configure_logging
 
-def generate_energy_costs(n_records=168):  # hourly for 7 days
-    now = datetime.now()
-    timestamps = [now - timedelta(hours=i) for i in range(n_records)]
+logger = logging.getLogger(__name__)
+
+PROVIDERS = pd.Index(["ABB Energy", "GridCo", "PowerX"])
+
+
+def iter_energy_costs(n_records=168, chunk_size=DEFAULT_CHUNK_SIZE, window=None, seed=None):
+    # Hourly prices walking back from now; chunk_size (rows) or window (e.g. "1D") sets the chunk width
+    now = pd.Timestamp.now()
+    rng = np.random.default_rng(seed)
+    step = steps_per_chunk(n_records, chunk_size, window, freq="1h")
 
-    data = {
-        "timestamp": [ts.isoformat() for ts in timestamps],
-        "provider": [random.choice(["ABB Energy", "GridCo", "PowerX"]) for _ in range(n_records)],
-        "cost_per_kwh": np.random.uniform(0.08, 0.18, n_records).round(3)
-    }
+    for start, stop in chunk_bounds(n_records, step):
+        n = stop - start
+        yield pd.DataFrame(
+            {
+                "timestamp": now - pd.to_timedelta(np.arange(start, stop), unit="h"),
+                "provider": pd.Categorical.from_codes(rng.integers(0, len(PROVIDERS), n), categories=PROVIDERS),
+                "cost_per_kwh": rng.uniform(0.08, 0.18, n).round(3),
+            }
+        )
 
-    return pd.DataFrame(data)
+
+def generate_energy_costs(n_records=168, seed=None):  # hourly for 7 days
+    return next(iter_energy_costs(n_records, chunk_size=None, seed=seed))
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate energy_costs data and upload it to the bronze layer.")
+    parser.add_argument("--format", choices=list(FORMATS), default="json")
+    args = parser.parse_args()
+    configure_logging()
+
+    from devops.terraform.utils.blob_uploader import upload_to_blob
+
     # 1. Generate Data
     df = generate_energy_costs()
 
@@ -28,12 +51,12 @@ if __name__ == "__main__":
     output_dir = os.path.join("data_simulator", "landing", date_str, "energy_costs")
     os.makedirs(output_dir, exist_ok=True)
 
-    filename = f"energy_costs_{now.strftime('%H-%M-%S')}.json"
+    filename = output_filename("energy_costs", now.strftime("%H-%M-%S"), args.format)
     full_path = os.path.join(output_dir, filename)
 
     # 3. Save to local file
-    df.to_json(full_path, orient="records", lines=False)
-    print(f"✅ Saved file: {full_path}")
+    write_chunks([df], full_path, args.format, domain="energy_costs")
+    logger.info("✅ Saved file: %s", full_path)
 
     # 4. Upload to Azure Blob
-    upload_to_blob(full_path, layer="bronze", domain="energy_costs")
\ No newline at end of file
+    upload_to_blob(full_path, layer="bronze", domain="energy_costs")
@@ -0,0 +1,234 @@
+"""
+Fleet-level simulation on one shared clock.
+
+Instead of five independent generators, every domain is derived from the
+same timeline so the gold tables join meaningfully:
+
+- weather is one regional series (diurnal cycle + random walk) per step
+- energy_costs is an hourly price curve with morning/evening peaks
+- vehicle_usage assigns each unit a route and an hourly status/duty cycle
+- telemetry load comes from duty x route profile, temperature from ambient
+  weather, vibration from wind and rain, and each reading is priced with
+  the hour's energy cost
+- maintenance logs are raised a few hours after critical telemetry faults
+
+    python -m data_simulator.simulate_fleet --units 500 --steps 1440
+"""
+
+import argparse
+import logging
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from data_simulator.chunking import DEFAULT_CHUNK_SIZE, steps_per_chunk, chunk_bounds
+from data_simulator.simulate_telemetry import classify_faults, unit_categories
+from data_simulator.simulate_vehicle_usage import ROUTES, STATUSES
+from data_simulator.simulate_energy_costs import PROVIDERS
+from data_simulator.simulate_maintenance_logs import TECHNICIANS
+
+logger = logging.getLogger(__name__)
+
+# Relative load each route puts on a unit when it is fully active
+ROUTE_LOAD = np.array([0.6, 0.8, 1.0, 1.2])
+# Probability of each status (Active, Idle, Maintenance, Standby) per unit-hour, and its duty range
+STATUS_PROBS = np.array([0.6, 0.2, 0.05, 0.15])
+STATUS_DUTY = np.array([[0.6, 1.0], [0.0, 0.0], [0.0, 0.0], [0.0, 0.2]])
+
+FAULT_DESCRIPTIONS = pd.Index(["Power anomaly", "Brake calibration"])
+
+
+class FleetSimulation:
+    def __init__(self, n_units=10, n_steps=1440, freq="1min", end=None, seed=None):
+        self.n_units = n_units
+        self.rng = np.random.default_rng(seed)
+        step = pd.Timedelta(freq)
+        end = pd.Timestamp(end or datetime.now()).floor(freq)
+        self.clock = pd.date_range(end - step * (n_steps - 1), periods=n_steps, freq=freq)
+        self.step_hours = step / pd.Timedelta(hours=1)
+
+        # Every per-step lookup goes through the hour index into the hourly tables
+        first_hour = self.clock[0].floor("h")
+        self.hour_of_step = ((self.clock - first_hour) // pd.Timedelta(hours=1)).to_numpy()
+        self.hours = pd.date_range(first_hour, periods=int(self.hour_of_step[-1]) + 1, freq="h")
+        self.units = unit_categories(n_units)
+
+        self.weather = self._weather()
+        self.energy_costs = self._energy_costs()
+        self.unit_routes = self.rng.integers(0, len(ROUTES), n_units)
+        self.status, self.duty = self._duty_cycle()
+
+    def _weather(self):
+        n = len(self.clock)
+        hour_of_day = self.clock.hour.to_numpy() + self.clock.minute.to_numpy() / 60
+        drift = np.cumsum(self.rng.normal(0, 0.05, n))
+        rain = self.rng.random(n) < 0.1
+        return pd.DataFrame(
+            {
+                "timestamp": self.clock,
+                "temperature_C": (15 + 6 * np.sin(2 * np.pi * (hour_of_day - 9) / 24) + drift).round(1),
+                "humidity_%": np.clip(60 + 15 * rain + self.rng.normal(0, 5, n), 0, 100).round(1),
+                "wind_speed_kmh": np.abs(15 + self.rng.normal(0, 3, n)).round(1),
+                "precip_mm": np.where(rain, self.rng.exponential(1.5, n), 0.0).round(2),
+            }
+        )
+
+    def _energy_costs(self):
+        n = len(self.hours)
+        hour = self.hours.hour.to_numpy()
+        peak = ((hour >= 7) & (hour < 10)) | ((hour >= 17) & (hour < 21))
+        return pd.DataFrame(
+            {
+                "timestamp": self.hours,
+                "provider": pd.Categorical.from_codes(self.rng.integers(0, len(PROVIDERS), n), categories=PROVIDERS),
+                "cost_per_kwh": (0.10 + 0.05 * peak + self.rng.uniform(-0.01, 0.01, n)).round(3),
+            }
+        )
+
+    def _duty_cycle(self):
+        shape = (len(self.hours), self.n_units)
+        status = self.rng.choice(len(STATUSES), size=shape, p=STATUS_PROBS)
+        low, high = STATUS_DUTY[status, 0], STATUS_DUTY[status, 1]
+        return status, low + (high - low) * self.rng.random(shape)
+
+    def vehicle_usage(self):
+        n_hours = len(self.hours)
+        return pd.DataFrame(
+            {
+                "unit_id": pd.Categorical.from_codes(np.tile(np.arange(self.n_units), n_hours), categories=self.units),
+                "timestamp": np.repeat(self.hours.values, self.n_units),
+                "route": pd.Categorical.from_codes(np.tile(self.unit_routes, n_hours), categories=ROUTES),
+                "usage_hours": self.duty.ravel().round(2),
+                "status": pd.Categorical.from_codes(self.status.ravel(), categories=STATUSES),
+            }
+        )
+
+    def telemetry_block(self, start, stop):
+        # (units, steps) grids, flattened unit-major like generate_telemetry
+        hours = self.hour_of_step[start:stop]
+        weather = self.weather.iloc[start:stop]
+        load = self.duty[hours].T * ROUTE_LOAD[self.unit_routes][:, None]
+        shape = load.shape
+
+        ambient = weather["temperature_C"].to_numpy()
+        wind = weather["wind_speed_kmh"].to_numpy()
+        wet = (weather["precip_mm"].to_numpy() > 0) * 0.1
+
+        temperature = 55 + 0.6 * ambient + 18 * load + self.rng.normal(0, 3, shape)
+        vibration = 30 + 30 * load + 0.4 * wind + 10 * wet + self.rng.normal(0, 6, shape)
+        power_draw = 40 + 90 * (load + wet) + self.rng.normal(0, 8, shape)
+        energy_cost = power_draw * self.step_hours * self.energy_costs["cost_per_kwh"].to_numpy()[hours]
+
+        fault_code = classify_faults(temperature, vibration)
+        return (
+            pd.DataFrame(
+                {
+                    "unit_id": pd.Categorical.from_codes(
+                        np.repeat(np.arange(self.n_units), stop - start), categories=self.units
+                    ),
+                    "timestamp": np.tile(self.clock.values[start:stop], self.n_units),
+                    "temperature": temperature.ravel().round(2),
+                    "vibration": vibration.ravel().round(2),
+                    "power_draw": power_draw.ravel().round(2),
+                    "energy_cost": energy_cost.ravel().round(4),
+                    "fault_code": fault_code.ravel(),
+                }
+            ),
+            temperature > 90,
+        )
+
+    def maintenance_for(self, telemetry, overheated, raised=None):
+        # One work order per unit-hour with a critical fault, logged 1-4 hours after the fault. An hour can
+        # span several time-window chunks, so raised holds the unit-hour keys earlier chunks already ordered.
+        # Returns (work orders or None, raised plus this chunk's keys).
+        raised = np.empty(0, np.int64) if raised is None else raised
+        critical = np.flatnonzero(telemetry["fault_code"].to_numpy() == 2)
+        if len(critical) == 0:
+            return None, raised
+        timestamps = telemetry["timestamp"].to_numpy()[critical]
+        units = telemetry["unit_id"].cat.codes.to_numpy()[critical]
+        keys = units.astype(np.int64) * len(self.hours) + (
+            (timestamps - self.hours.values[0]) // np.timedelta64(1, "h")
+        )
+        keys, first = np.unique(keys, return_index=True)
+        first = first[~np.isin(keys, raised)]
+        raised = np.union1d(raised, keys)
+        if len(first) == 0:
+            return None, raised
+        critical, timestamps, units = critical[first], timestamps[first], units[first]
+        n = len(critical)
+        delay = pd.to_timedelta(self.rng.integers(60, 241, n), unit="min").to_numpy()
+        return (
+            pd.DataFrame(
+                {
+                    "unit_id": pd.Categorical.from_codes(units, categories=self.units),
+                    "timestamp": timestamps + delay,
+                    "fault_code": np.full(n, 2),
+                    "description": pd.Categorical.from_codes(
+                        (~overheated.ravel()[critical]).astype(np.int8), categories=FAULT_DESCRIPTIONS
+                    ),
+                    "technician": pd.Categorical.from_codes(
+                        self.rng.integers(0, len(TECHNICIANS), n), categories=TECHNICIANS
+                    ),
+                }
+            ),
+            raised,
+        )
+
+    def iter_domain_chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        # Yields (domain, DataFrame) pairs: the small hourly/regional tables first, then telemetry
+        # in time-window chunks, with maintenance derived from each chunk's faults
+        yield "weather", self.weather
+        yield "energy_costs", self.energy_costs
+        yield "vehicle_usage", self.vehicle_usage()
+
+        n_steps = len(self.clock)
+        step = steps_per_chunk(n_steps, chunk_size, rows_per_step=self.n_units)
+        raised = None
+        for start, stop in chunk_bounds(n_steps, step):
+            telemetry, overheated = self.telemetry_block(start, stop)
+            yield "telemetry", telemetry
+            maintenance, raised = self.maintenance_for(telemetry, overheated, raised)
+            # Only the hour this chunk ended in can continue into the next one
+            raised = raised[raised % len(self.hours) >= self.hour_of_step[stop - 1]]
+            if maintenance is not None:
+                yield "maintenance", maintenance
+
+
+def generate_fleet(n_units=10, n_steps=1440, freq="1min", seed=None):
+    # All domains in memory as {domain: DataFrame}; use FleetSimulation.iter_domain_chunks for large runs
+    frames = {}
+    for domain, chunk in FleetSimulation(n_units, n_steps, freq, seed=seed).iter_domain_chunks(chunk_size=None):
+        frames.setdefault(domain, []).append(chunk)
+    return {domain: pd.concat(chunks, ignore_index=True) for domain, chunks in frames.items()}
+
+
+if __name__ == "__main__":
+    from data_simulator.writers import FORMATS, output_filename, write_domain_chunks
+    from devops.terraform.utils.blob_uploader import upload_to_blob
+    from devops.terraform.utils.instrumentation import configure_logging
+
+    parser = argparse.ArgumentParser(description="Simulate all domains on one shared fleet clock.")
+    parser.add_argument("--units", type=int, default=10)
+    parser.add_argument("--steps", type=int, default=1440)
+    parser.add_argument("--freq", default="1min")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--format", choices=list(FORMATS), default="ndjson")
+    args = parser.parse_args()
+    configure_logging()
+
+    now = datetime.now()
+    base_folder = os.path.join("data_simulator", "landing", now.strftime("%Y/%m/%d"))
+    stamp = f"fleet_{now.strftime('%H-%M-%S')}"
+
+    def path_for(domain):
+        return os.path.join(base_folder, domain, output_filename(domain, stamp, args.format))
+
+    simulation = FleetSimulation(args.units, args.steps, args.freq, seed=args.seed)
+    rows = write_domain_chunks(simulation.iter_domain_chunks(args.chunk_size), path_for, args.format)
+    for domain, count in rows.items():
+        logger.info("✅ Saved %d %s rows: %s", count, domain, path_for(domain))
+        upload_to_blob(path_for(domain), layer="bronze", domain=domain)
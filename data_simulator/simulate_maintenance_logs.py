@@ -1,34 +1,56 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
 import os
-from devops.terraform.utils.blob_uploader import upload_to_blob
+import argparse
+import logging
+from data_simulator.writers import FORMATS, output_filename, write_chunks
+from data_simulator.simulate_telemetry import unit_categories
+from data_simulator.chunking import DEFAULT_CHUNK_SIZE, steps_per_chunk, chunk_bounds
+from devops.terraform.utils.instrumentation import configure_logging
 
-def generate_maintenance_logs(n_units=10, n_logs=100):
-    unit_ids = [f'TU_{i}' for i in range(1, n_units + 1)]
-    now = datetime.now()
+logger = logging.getLogger(__name__)
+
+DESCRIPTIONS = pd.Index(["Brake calibration", "Oil change", "Power anomaly", "Sensor check", "Routine inspection"])
+TECHNICIANS = pd.Index(["Alex", "Samira", "Lee", "Fernando", "Anja"])
+
+
+def _maintenance_block(rng, unit_ids, now, n_logs):
+    # Batched draws over category codes; low-cardinality fields stay categorical
+    return pd.DataFrame(
+        {
+            "unit_id": pd.Categorical.from_codes(rng.integers(0, len(unit_ids), n_logs), categories=unit_ids),
+            "timestamp": now - pd.to_timedelta(rng.integers(1, 49, n_logs), unit="h"),
+            "fault_code": rng.integers(0, 3, n_logs),
+            "description": pd.Categorical.from_codes(
+                rng.integers(0, len(DESCRIPTIONS), n_logs), categories=DESCRIPTIONS
+            ),
+            "technician": pd.Categorical.from_codes(rng.integers(0, len(TECHNICIANS), n_logs), categories=TECHNICIANS),
+        }
+    )
+
+
+def iter_maintenance_logs(n_units=10, n_logs=100, chunk_size=DEFAULT_CHUNK_SIZE, seed=None):
+    unit_ids = unit_categories(n_units)
+    now = pd.Timestamp.now()
+    rng = np.random.default_rng(seed)
+
+    for start, stop in chunk_bounds(n_logs, steps_per_chunk(n_logs, chunk_size)):
+        yield _maintenance_block(rng, unit_ids, now, stop - start)
+
+
+def generate_maintenance_logs(n_units=10, n_logs=100, seed=None):
+    return next(iter_maintenance_logs(n_units, n_logs, chunk_size=None, seed=seed))
 
-    logs = []
-    for _ in range(n_logs):
-        unit = random.choice(unit_ids)
-        timestamp = now - timedelta(hours=random.randint(1, 48))
-        fault_code = random.choice([0, 1, 2])
-        description = random.choice([
-            "Brake calibration", "Oil change", "Power anomaly", "Sensor check", "Routine inspection"
-        ])
-        technician = random.choice(["Alex", "Samira", "Lee", "Fernando", "Anja"])
-        logs.append({
-            "unit_id": unit,
-            "timestamp": timestamp.isoformat(),
-            "fault_code": fault_code,
-            "description": description,
-            "technician": technician
-        })
-
-    return pd.DataFrame(logs)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate maintenance data and upload it to the bronze layer.")
+    parser.add_argument("--format", choices=list(FORMATS), default="json")
+    args = parser.parse_args()
+    configure_logging()
+
+    from devops.terraform.utils.blob_uploader import upload_to_blob
+
     # 1. Generate the Data
     df = generate_maintenance_logs()
 
@@ -38,12 +60,12 @@ if __name__ == "__main__":
     output_dir = os.path.join("data_simulator", "landing", date_str, "maintenance")
     os.makedirs(output_dir, exist_ok=True)
 
-    filename = f"maintenance_logs_{now.strftime('%H-%M-%S')}.json"
+    filename = output_filename("maintenance_logs", now.strftime("%H-%M-%S"), args.format)
     full_path = os.path.join(output_dir, filename)
 
     # 3. Save to Local File
-    df.to_json(full_path, orient="records", lines=False)
-    print(f"✅ Saved: {full_path}")
+    write_chunks([df], full_path, args.format, domain="maintenance")
+    logger.info("✅ Saved: %s", full_path)
 
     # 4. Upload to Azure Blob
     upload_to_blob(full_path, layer="bronze", domain="maintenance")
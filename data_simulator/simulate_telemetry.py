@@ -2,40 +2,86 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import os
-from devops.terraform.utils.blob_uploader import upload_to_blob
+import argparse
+import logging
+from data_simulator.writers import FORMATS, output_filename, write_chunks
+from data_simulator.chunking import DEFAULT_CHUNK_SIZE, steps_per_chunk, chunk_bounds
+from devops.terraform.utils.instrumentation import configure_logging
 
-def generate_telemetry(n_units=10, n_records_per_unit=1440):
+logger = logging.getLogger(__name__)
+
+# Sensor baselines as (mean, std) rows: temperature, vibration, power_draw
+SENSOR_MEANS = np.array([[75.0], [50.0], [120.0]])
+SENSOR_STDS = np.array([[5.0], [10.0], [15.0]])
+
+
+def classify_faults(temperature, vibration):
+    # 2 = critical, 1 = warning, 0 = healthy (same thresholds as the per-row loop it replaced)
+    return np.select(
+        [(temperature > 90) | (vibration > 80), (temperature > 85) | (vibration > 70)],
+        [2, 1],
+        default=0,
+    )
+
+
+def unit_categories(n_units):
+    return pd.Index([f"TU_{i}" for i in range(1, n_units + 1)])
+
+
+def _telemetry_block(rng, timestamps, n_units):
+    n_steps = len(timestamps)
+    n_rows = n_units * n_steps
+
+    # One preallocated (3, n_rows) block holds every sensor for every unit, unit-major
+    sensors = rng.standard_normal((3, n_rows))
+    sensors *= SENSOR_STDS
+    sensors += SENSOR_MEANS
+    temperature, vibration, power_draw = sensors
+
+    fault_code = classify_faults(temperature, vibration)
+    np.round(sensors, 2, out=sensors)
+
+    unit_codes = np.repeat(np.arange(n_units, dtype=np.int32), n_steps)
+
+    return pd.DataFrame(
+        {
+            "unit_id": pd.Categorical.from_codes(unit_codes, categories=unit_categories(n_units)),
+            "timestamp": np.tile(timestamps.values, n_units),
+            "temperature": temperature,
+            "vibration": vibration,
+            "power_draw": power_draw,
+            "fault_code": fault_code,
+        }
+    )
+
+
+def iter_telemetry(
+    n_units=10, n_records_per_unit=1440, freq="1min", seed=None, chunk_size=DEFAULT_CHUNK_SIZE, window=None
+):
+    # Yields time-window chunks covering every unit; chunk_size (rows) or window (e.g. "1h") sets the width
     start_time = datetime.now() - timedelta(days=1)
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range(start_time, periods=n_records_per_unit, freq=freq)
+
+    step = steps_per_chunk(n_records_per_unit, chunk_size, window, freq, rows_per_step=n_units)
+    for start, stop in chunk_bounds(n_records_per_unit, step):
+        yield _telemetry_block(rng, timestamps[start:stop], n_units)
+
+
+def generate_telemetry(n_units=10, n_records_per_unit=1440, freq="1min", seed=None):
+    df = next(iter_telemetry(n_units, n_records_per_unit, freq, seed, chunk_size=None))
+    logger.debug("✅ Simulation complete for %d units (%d rows)", n_units, len(df))
+    return df
 
-    def simulate_unit_data(unit_id):
-        timestamps = [start_time + timedelta(minutes=i) for i in range(n_records_per_unit)]
-        temperature = np.random.normal(loc=75, scale=5, size=n_records_per_unit)
-        vibration = np.random.normal(loc=50, scale=10, size=n_records_per_unit)
-        power_draw = np.random.normal(loc=120, scale=15, size=n_records_per_unit)
-
-        fault_code = []
-        for t, v in zip(temperature, vibration):
-            if t > 90 or v > 80:
-                fault_code.append(2)
-            elif t > 85 or v > 70:
-                fault_code.append(1)
-            else:
-                fault_code.append(0)
-
-        print(f"✅ Simulation complete for unit {unit_id}")
-        return pd.DataFrame({
-            'unit_id': unit_id,
-            'timestamp': timestamps,
-            'temperature': temperature.round(2),
-            'vibration': vibration.round(2),
-            'power_draw': power_draw.round(2),
-            'fault_code': fault_code
-        })
-
-    all_data = pd.concat([simulate_unit_data(f'TU_{i}') for i in range(1, n_units+1)], ignore_index=True)
-    return all_data
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate telemetry data and upload it to the bronze layer.")
+    parser.add_argument("--format", choices=list(FORMATS), default="json")
+    args = parser.parse_args()
+    configure_logging()
+
+    from devops.terraform.utils.blob_uploader import upload_to_blob
+
     # 1. Generate Data
     df = generate_telemetry()
 
@@ -45,12 +91,12 @@ if __name__ == "__main__":
     output_dir = os.path.join("data_simulator", "landing", date_str, "telemetry")
     os.makedirs(output_dir, exist_ok=True)
 
-    filename = f"telemetry_{now.strftime('%H-%M-%S')}.json"
+    filename = output_filename("telemetry", now.strftime("%H-%M-%S"), args.format)
     full_path = os.path.join(output_dir, filename)
 
     # 3. Save to file
-    df.to_json(full_path, orient="records", lines=False)
-    print(f"✅ Saved telemetry file: {full_path}")
+    write_chunks([df], full_path, args.format, domain="telemetry")
+    logger.info("✅ Saved telemetry file: %s", full_path)
 
     # 4. Upload to Azure Blob (bronze layer)
     upload_to_blob(full_path, layer="bronze", domain="telemetry")
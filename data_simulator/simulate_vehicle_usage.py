@@ -1,32 +1,54 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
 import os
-from devops.terraform.utils.blob_uploader import upload_to_blob
+import argparse
+import logging
+from data_simulator.writers import FORMATS, output_filename, write_chunks
+from data_simulator.simulate_telemetry import unit_categories
+from data_simulator.chunking import DEFAULT_CHUNK_SIZE, steps_per_chunk, chunk_bounds
+from devops.terraform.utils.instrumentation import configure_logging
 
-def generate_vehicle_usage(n_units=10, n_records=300):
-    unit_ids = [f'TU_{i}' for i in range(1, n_units + 1)]
-    now = datetime.now()
+logger = logging.getLogger(__name__)
+
+ROUTES = pd.Index(["R1", "R2", "R3", "R4"])
+STATUSES = pd.Index(["Active", "Idle", "Maintenance", "Standby"])
+
+
+def _vehicle_usage_block(rng, unit_ids, now, n_records):
+    # Batched draws over category codes; low-cardinality fields stay categorical
+    return pd.DataFrame(
+        {
+            "unit_id": pd.Categorical.from_codes(rng.integers(0, len(unit_ids), n_records), categories=unit_ids),
+            "timestamp": now - pd.to_timedelta(rng.integers(0, 73, n_records), unit="h"),
+            "route": pd.Categorical.from_codes(rng.integers(0, len(ROUTES), n_records), categories=ROUTES),
+            "usage_hours": rng.uniform(1, 12, n_records).round(2),
+            "status": pd.Categorical.from_codes(rng.integers(0, len(STATUSES), n_records), categories=STATUSES),
+        }
+    )
+
+
+def iter_vehicle_usage(n_units=10, n_records=300, chunk_size=DEFAULT_CHUNK_SIZE, seed=None):
+    unit_ids = unit_categories(n_units)
+    now = pd.Timestamp.now()
+    rng = np.random.default_rng(seed)
+
+    for start, stop in chunk_bounds(n_records, steps_per_chunk(n_records, chunk_size)):
+        yield _vehicle_usage_block(rng, unit_ids, now, stop - start)
+
+
+def generate_vehicle_usage(n_units=10, n_records=300, seed=None):
+    return next(iter_vehicle_usage(n_units, n_records, chunk_size=None, seed=seed))
 
-    usage = []
-    for _ in range(n_records):
-        unit = random.choice(unit_ids)
-        timestamp = now - timedelta(hours=random.randint(0, 72))
-        usage_hours = round(np.random.uniform(1, 12), 2)
-        route = random.choice(["R1", "R2", "R3", "R4"])
-        status = random.choice(["Active", "Idle", "Maintenance", "Standby"])
-        usage.append({
-            "unit_id": unit,
-            "timestamp": timestamp.isoformat(),
-            "route": route,
-            "usage_hours": usage_hours,
-            "status": status
-        })
-
-    return pd.DataFrame(usage)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate vehicle_usage data and upload it to the bronze layer.")
+    parser.add_argument("--format", choices=list(FORMATS), default="json")
+    args = parser.parse_args()
+    configure_logging()
+
+    from devops.terraform.utils.blob_uploader import upload_to_blob
+
     # 1. Generate the data
     df = generate_vehicle_usage()
 
@@ -36,12 +58,12 @@ if __name__ == "__main__":
     output_dir = os.path.join("data_simulator", "landing", date_str, "vehicle_usage")
     os.makedirs(output_dir, exist_ok=True)
 
-    filename = f"vehicle_usage_{now.strftime('%H-%M-%S')}.json"
+    filename = output_filename("vehicle_usage", now.strftime("%H-%M-%S"), args.format)
     full_path = os.path.join(output_dir, filename)
 
     # 3. Save to file
-    df.to_json(full_path, orient="records", lines=False)
-    print(f"✅ File created: {full_path}")
+    write_chunks([df], full_path, args.format, domain="vehicle_usage")
+    logger.info("✅ File created: %s", full_path)
 
     # 4. Upload to Azure Blob
     upload_to_blob(full_path, layer="bronze", domain="vehicle_usage")
@@ -1,24 +1,47 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
-from devops.terraform.utils.blob_uploader import upload_to_blob
+import argparse
+import logging
+from data_simulator.writers import FORMATS, output_filename, write_chunks
+from data_simulator.chunking import DEFAULT_CHUNK_SIZE, steps_per_chunk, chunk_bounds
+from devops.terraform.utils.instrumentation import configure_logging
 
-def generate_weather(n_records=1440):
-    now = datetime.now()
-    timestamps = [now - timedelta(minutes=i) for i in range(n_records)]
+logger = logging.getLogger(__name__)
+
+
+def iter_weather(n_records=1440, chunk_size=DEFAULT_CHUNK_SIZE, window=None, seed=None):
+    # Minute readings walking back from now; chunk_size (rows) or window (e.g. "6h") sets the chunk width
+    now = pd.Timestamp.now()
+    rng = np.random.default_rng(seed)
+    step = steps_per_chunk(n_records, chunk_size, window, freq="1min")
+
+    for start, stop in chunk_bounds(n_records, step):
+        n = stop - start
+        yield pd.DataFrame(
+            {
+                "timestamp": now - pd.to_timedelta(np.arange(start, stop), unit="min"),
+                "temperature_C": rng.normal(loc=20, scale=5, size=n).round(1),
+                "humidity_%": rng.normal(loc=60, scale=10, size=n).round(1),
+                "wind_speed_kmh": rng.normal(loc=15, scale=3, size=n).round(1),
+                "precip_mm": rng.exponential(scale=1.0, size=n).round(2),
+            }
+        )
 
-    data = {
-        "timestamp": [ts.isoformat() for ts in timestamps],
-        "temperature_C": np.random.normal(loc=20, scale=5, size=n_records).round(1),
-        "humidity_%": np.random.normal(loc=60, scale=10, size=n_records).round(1),
-        "wind_speed_kmh": np.random.normal(loc=15, scale=3, size=n_records).round(1),
-        "precip_mm": np.random.exponential(scale=1.0, size=n_records).round(2)
-    }
 
-    return pd.DataFrame(data)
+def generate_weather(n_records=1440, seed=None):
+    return next(iter_weather(n_records, chunk_size=None, seed=seed))
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate weather data and upload it to the bronze layer.")
+    parser.add_argument("--format", choices=list(FORMATS), default="json")
+    args = parser.parse_args()
+    configure_logging()
+
+    from devops.terraform.utils.blob_uploader import upload_to_blob
+
     # 1. Generate the data
     df = generate_weather()
 
@@ -28,12 +51,12 @@ if __name__ == "__main__":
     output_dir = os.path.join("data_simulator", "landing", date_str, "weather")
     os.makedirs(output_dir, exist_ok=True)
 
-    filename = f"weather_{now.strftime('%H-%M-%S')}.json"
+    filename = output_filename("weather", now.strftime("%H-%M-%S"), args.format)
     full_path = os.path.join(output_dir, filename)
 
     # 3. Save to file
-    df.to_json(full_path, orient="records", lines=False)
-    print(f"✅ Weather file saved: {full_path}")
+    write_chunks([df], full_path, args.format, domain="weather")
+    logger.info("✅ Weather file saved: %s", full_path)
 
     # 4. Upload to Azure Blob
     upload_to_blob(full_path, layer="bronze", domain="weather")
@@ -0,0 +1,236 @@
+"""
+Continuous telemetry emitter for load-testing the streaming ingestion path.
+
+Emits one reading per unit every 1/hz seconds on an asyncio loop, either to
+rolling NDJSON files in the landing layout or to clients of a local socket
+(plain TCP or HTTP, e.g. `curl localhost:5000`). Sinks that fall behind fill
+a bounded queue, which stalls the producer; the resulting delay shows up as
+lag in the live readout.
+
+    python -m data_simulator.stream_emitter --units 5000 --hz 1 --sink file
+    python -m data_simulator.stream_emitter --units 100 --hz 10 --sink socket --port 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from data_simulator.simulate_telemetry import _telemetry_block
+from devops.terraform.utils.instrumentation import configure_logging, metrics
+
+logger = logging.getLogger(__name__)
+
+
+class EmitterStats:
+    def __init__(self):
+        self.emitted = 0
+        self.dropped = 0  # readings no sink client received
+        self.ticks = 0
+        self.lag = 0.0
+
+
+class RollingFileSink:
+    # Writes <landing>/YYYY/MM/DD/telemetry/telemetry_stream_<HH-MM-SS-ffffff>_<seq>.json, renaming a file
+    # into place only when it is complete so watchers never pick up a half-written one. The sequence number
+    # keeps sub-second rolls from replacing a completed file
+    def __init__(self, landing_root, roll_seconds=60.0, domain="telemetry"):
+        self.landing_root = landing_root
+        self.roll_seconds = roll_seconds
+        self.domain = domain
+        self.f = None
+        self.path = None
+        self.opened_at = 0.0
+        self.sequence = 0
+
+    def _open(self):
+        now = datetime.now()
+        folder = os.path.join(self.landing_root, now.strftime("%Y/%m/%d"), self.domain)
+        os.makedirs(folder, exist_ok=True)
+        name = f"{self.domain}_stream_{now.strftime('%H-%M-%S-%f')}_{self.sequence:06d}.json"
+        self.path = os.path.join(folder, name)
+        self.sequence += 1
+        self.f = open(f"{self.path}.partial", "w", encoding="utf-8")
+        self.opened_at = time.monotonic()
+
+    def _roll(self):
+        self.f.close()
+        os.replace(f"{self.path}.partial", self.path)
+        logger.info("✅ Rolled stream file: %s", self.path)
+        self.f = None
+
+    async def write(self, payload):
+        # Returns whether the payload was written, like SocketSink.write
+        if self.f is None:
+            self._open()
+        self.f.write(payload)
+        if time.monotonic() - self.opened_at >= self.roll_seconds:
+            self._roll()
+        return True
+
+    def describe(self):
+        return os.path.basename(self.path) if self.path else "-"
+
+    async def close(self):
+        if self.f is not None:
+            self._roll()
+
+
+class SocketSink:
+    # Broadcasts NDJSON to every connected client; HTTP clients get a streaming 200 response first
+    def __init__(self, host="0.0.0.0", port=5000):
+        self.host = host
+        self.port = port
+        self.clients = set()
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._on_client, self.host, self.port)
+        logger.info("📡 Streaming telemetry on %s:%s", self.host, self.port)
+
+    async def _on_client(self, reader, writer):
+        try:
+            first_line = await asyncio.wait_for(reader.readline(), timeout=0.5)
+        except asyncio.TimeoutError:
+            first_line = b""
+        except asyncio.CancelledError:
+            writer.close()  # emitter shutting down mid-handshake
+            return
+        if first_line.split(b" ", 1)[0] in (b"GET", b"POST", b"HEAD"):
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n")
+        self.clients.add(writer)
+
+    async def _send(self, writer, data):
+        try:
+            writer.write(data)
+            await writer.drain()
+            return True
+        except (ConnectionError, OSError):
+            self.clients.discard(writer)
+            writer.close()
+            return False
+
+    async def write(self, payload):
+        # Returns whether any client received the payload; with nobody connected it is dropped
+        if not self.clients:
+            return False
+        data = payload.encode("utf-8")
+        # The slowest client sets the pace: drain() waits on its socket buffer
+        sent = await asyncio.gather(*(self._send(writer, data) for writer in list(self.clients)))
+        return any(sent)
+
+    def describe(self):
+        return f"{len(self.clients)} client(s)"
+
+    async def close(self):
+        for writer in list(self.clients):
+            writer.close()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+
+async def produce(queue, stats, n_units, hz, seed=None, duration=None):
+    rng = np.random.default_rng(seed)
+    period = 1.0 / hz
+    loop = asyncio.get_running_loop()
+    start, wall_start = loop.time(), datetime.now()
+
+    while duration is None or stats.ticks * period < duration:
+        scheduled = start + stats.ticks * period
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        stats.lag = max(0.0, loop.time() - scheduled)
+
+        # Event time is the scheduled tick, so lag shows up as late arrival rather than shifted data
+        event_time = pd.DatetimeIndex([wall_start + timedelta(seconds=stats.ticks * period)])
+        frame = _telemetry_block(rng, event_time, n_units)
+        payload = frame.to_json(orient="records", lines=True, date_format="iso")
+        await queue.put((len(frame), payload))  # waits here when the sink falls behind
+        stats.ticks += 1
+    await queue.put(None)
+
+
+async def consume(queue, sink, stats):
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+        rows, payload = item
+        # Only what the sink delivered counts towards throughput
+        if await sink.write(payload):
+            stats.emitted += rows
+            metrics.count("events", rows, sink=type(sink).__name__)
+        else:
+            stats.dropped += rows
+            metrics.count("events_dropped", rows, sink=type(sink).__name__)
+
+
+async def report(queue, sink, stats, interval):
+    last_emitted, last_time = 0, time.monotonic()
+    while True:
+        await asyncio.sleep(interval)
+        now = time.monotonic()
+        rate = (stats.emitted - last_emitted) / (now - last_time)
+        last_emitted, last_time = stats.emitted, now
+        logger.info(
+            "📈 %s events/s | total %s | dropped %s | queue %d/%d | lag %.0f ms | %s",
+            f"{rate:,.0f}",
+            f"{stats.emitted:,}",
+            f"{stats.dropped:,}",
+            queue.qsize(),
+            queue.maxsize,
+            stats.lag * 1000,
+            sink.describe(),
+        )
+
+
+async def run_emitter(sink, n_units=10, hz=1.0, seed=None, duration=None, queue_size=32, report_interval=5.0):
+    if hasattr(sink, "start"):
+        await sink.start()
+    stats = EmitterStats()
+    queue = asyncio.Queue(maxsize=queue_size)
+    reporter = asyncio.create_task(report(queue, sink, stats, report_interval))
+    try:
+        await asyncio.gather(
+            produce(queue, stats, n_units, hz, seed, duration),
+            consume(queue, sink, stats),
+        )
+    finally:
+        reporter.cancel()
+        await sink.close()
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Emit telemetry continuously at a target rate.")
+    parser.add_argument("--units", type=int, default=10)
+    parser.add_argument("--hz", type=float, default=1.0, help="Readings per unit per second")
+    parser.add_argument("--sink", choices=["file", "socket"], default="file")
+    parser.add_argument("--landing-root", default=os.path.join("data_simulator", "landing"))
+    parser.add_argument("--roll-seconds", type=float, default=60.0)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--duration", type=float, default=None, help="Seconds to run (default: forever)")
+    parser.add_argument("--queue-size", type=int, default=32, help="Ticks buffered before the producer stalls")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    configure_logging()
+
+    if args.sink == "file":
+        sink = RollingFileSink(args.landing_root, roll_seconds=args.roll_seconds)
+    else:
+        sink = SocketSink(args.host, args.port)
+    try:
+        asyncio.run(run_emitter(sink, args.units, args.hz, args.seed, args.duration, args.queue_size))
+    except KeyboardInterrupt:
+        logger.info("🛑 Emitter stopped.")
+    metrics.export()
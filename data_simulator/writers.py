@@ -0,0 +1,154 @@
+import gzip
+import os
+
+from devops.terraform.utils.instrumentation import metrics
+
+# Output format -> file extension. ndjson keeps .json so existing readers and the watcher still match it.
+FORMATS = {
+    "json": ".json",
+    "ndjson": ".json",
+    "ndjson.gz": ".json.gz",
+    "parquet": ".parquet",
+}
+
+
+def output_filename(prefix, stamp, fmt):
+    return f"{prefix}_{stamp}{FORMATS[fmt]}"
+
+
+# Every writer splits a chunk into serialize(df) -> payload and write_payload(payload),
+# so the two can be timed separately
+class JsonArrayWriter:
+    # A single JSON array, built chunk by chunk without holding the whole array in memory
+    def __init__(self, path):
+        self.f = open(path, "w", encoding="utf-8")
+        self.f.write("[")
+        self.empty = True
+
+    def serialize(self, df):
+        return df.to_json(orient="records", date_format="iso")[1:-1] if not df.empty else ""
+
+    def write_payload(self, body):
+        if not body:
+            return
+        if not self.empty:
+            self.f.write(",")
+        self.f.write(body)
+        self.empty = False
+
+    def write(self, df):
+        self.write_payload(self.serialize(df))
+
+    def close(self):
+        self.f.write("]")
+        self.f.close()
+
+
+class NdjsonWriter:
+    def __init__(self, path, compress=False):
+        if compress:
+            self.f = gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+        else:
+            self.f = open(path, "w", encoding="utf-8")
+
+    def serialize(self, df):
+        # pandas builds the full string before writing anyway, so this costs no extra memory
+        return df.to_json(orient="records", lines=True, date_format="iso")
+
+    def write_payload(self, body):
+        self.f.write(body)
+
+    def write(self, df):
+        self.write_payload(self.serialize(df))
+
+    def close(self):
+        self.f.close()
+
+
+class ParquetWriter:
+    # Row group per chunk; pyarrow is only needed when parquet output is requested
+    def __init__(self, path):
+        self.path = path
+        self.writer = None
+
+    def serialize(self, df):
+        import pyarrow as pa
+
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    def write_payload(self, table):
+        import pyarrow.parquet as pq
+
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, table.schema, compression="snappy")
+        elif not table.schema.equals(self.writer.schema, check_metadata=False):
+            table = table.cast(self.writer.schema)
+        self.writer.write_table(table)
+
+    def write(self, df):
+        self.write_payload(self.serialize(df))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def open_writer(path, fmt):
+    if fmt == "json":
+        return JsonArrayWriter(path)
+    if fmt in ("ndjson", "ndjson.gz"):
+        return NdjsonWriter(path, compress=fmt == "ndjson.gz")
+    if fmt == "parquet":
+        return ParquetWriter(path)
+    raise ValueError(f"Unknown output format: {fmt}. Choose from: {list(FORMATS)}")
+
+
+def _write_chunk(writer, chunk, domain, fmt):
+    # schemas pulls in pandas; imported here so reading FORMATS (e.g. for --help) stays cheap
+    from data_simulator.schemas import apply_schema
+
+    labels = {"domain": domain or "unknown", "format": fmt}
+    with metrics.span("serialize", **labels):
+        payload = writer.serialize(apply_schema(chunk, domain, narrow_floats=fmt == "parquet"))
+    with metrics.span("write", **labels):
+        writer.write_payload(payload)
+    metrics.count("rows", len(chunk), **labels)
+
+
+def _count_bytes(path, domain, fmt):
+    metrics.count("bytes", os.path.getsize(path), domain=domain or "unknown", format=fmt)
+
+
+def write_domain_chunks(pairs, path_for, fmt="ndjson"):
+    # Multi-domain variant of write_chunks: (domain, chunk) pairs fan out to one open writer per domain
+    writers, rows = {}, {}
+    try:
+        for domain, chunk in pairs:
+            if domain not in writers:
+                path = path_for(domain)
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                writers[domain] = open_writer(path, fmt)
+                rows[domain] = 0
+            _write_chunk(writers[domain], chunk, domain, fmt)
+            rows[domain] += len(chunk)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    for domain in writers:
+        _count_bytes(path_for(domain), domain, fmt)
+    return rows
+
+
+def write_chunks(chunks, path, fmt="ndjson", domain=None):
+    # Appends each DataFrame chunk to one file so only a single chunk is ever held in memory
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    writer = open_writer(path, fmt)
+    rows = 0
+    try:
+        for chunk in chunks:
+            _write_chunk(writer, chunk, domain, fmt)
+            rows += len(chunk)
+    finally:
+        writer.close()
+    _count_bytes(path, domain, fmt)
+    return rows
@@ -1,36 +1,356 @@
-import os
-import json
+"""
+Export the resource changes of a Terraform plan to Excel (or CSV).
+
+The plan JSON is streamed: only the elements of "resource_changes" are
+decoded, one at a time, and everything else (planned_values, prior_state,
+configuration, ...) is skipped without being built, so memory stays
+bounded however large the plan is. By default the JSON is piped straight
+from `terraform show -json` instead of going through plan.json.
+
+    python convert_plan_to_excel.py                                 # tfplan.binary -> plan_export.xlsx
+    python convert_plan_to_excel.py --plan-json plan.json --output plan_export.csv
+    terraform show -json tfplan.binary | python convert_plan_to_excel.py --plan-json -
+"""
+
+import argparse
+import codecs
 import csv
+import json
+import re
 import subprocess
+import sys
+from datetime import datetime
+
+FIELDNAMES = ["action", "resource_type", "resource_name", "address", "replace_reason"]
+# Sheet order in the workbook; anything else Terraform reports is appended after these
+ACTIONS = ["create", "update", "delete", "read", "no-op"]
+READ_SIZE = 1 << 20
+# Rows per sheet, Excel's limit minus the header; larger actions continue on "<action> (2)", ...
+MAX_SHEET_ROWS = 1_048_575
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]', re.S)
+_NOT_BRACKET = re.compile(r"[^\[\]{}]+")
+_SCALAR = re.compile(r"[^,\]}\s]+")
+
+
+def _unescaped(text, index):
+    start = index
+    while start and text[start - 1] == "\\":
+        start -= 1
+    return (index - start) % 2 == 0
+
+
+def _open_string_start(text):
+    # Position of the opening quote of a string left unterminated at the end of text, else len(text).
+    # text starts outside any string, so an odd number of unescaped quotes means one is still open.
+    quotes = text.count('"')
+    # Quotes after an odd run of backslashes are escaped: those after >=1, minus >=2, plus >=3, ...
+    run, sign = "\\", -1
+    while run + '"' in text:
+        quotes += sign * text.count(run + '"')
+        run, sign = run + "\\", -sign
+    if quotes % 2 == 0:
+        return len(text)
+    index = text.rfind('"')
+    while not _unescaped(text, index):
+        index = text.rfind('"', 0, index)
+    return index
+
+
+class _Scanner:
+    # Reads the stream in READ_SIZE chunks; the buffer only ever holds the unread tail plus the value in hand
+    def __init__(self, stream):
+        self.stream = stream
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        # Incremental, so a multi-byte character split across two reads is decoded once both halves are in
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+
+    def fill(self, at_least=READ_SIZE):
+        if self.eof:
+            return False
+        chunk = self.stream.read(max(at_least, READ_SIZE))
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos > len(self.buf) // 2:
+            self.buf, self.pos = self.buf[self.pos :], 0
+        self.buf += self.utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+        return True
+
+    def peek(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of plan JSON")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {self.buf[self.pos]!r}")
+        self.pos += 1
+
+    def decode(self, decoder=json.JSONDecoder()):
+        # One complete value; an element cut off by the chunk boundary is retried with more input.
+        # Each retry reads at least as much as is already buffered, so large values stay linear.
+        if self.peek() not in '"[{':
+            # A number or literal running to the end of the buffer may continue in the next chunk
+            while _SCALAR.match(self.buf, self.pos).end() == len(self.buf) and self.fill():
+                pass
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill(len(self.buf) - self.pos):
+                    raise
+                continue
+            self.pos = end
+            return value
+
+    def skip(self):
+        # Steps over one value without building it; containers are scanned a buffer at a time
+        char = self.peek()
+        if char == '"':
+            self._skip_string()
+        elif char in "[{":
+            self.pos += 1
+            depth = 1
+            while True:
+                text = self.buf[self.pos :]
+                # A string still open at the end of the buffer is left for the next pass
+                cut = _open_string_start(text)
+                # Brackets outside strings, with every matched pair cancelled out: what remains is
+                # the closers of enclosing containers followed by the openers still pending
+                brackets = _NOT_BRACKET.sub("", _STRING.sub("", text[:cut]))
+                while True:
+                    reduced = brackets.replace("[]", "").replace("{}", "")
+                    if reduced == brackets:
+                        break
+                    brackets = reduced
+                closers = len(brackets) - len(brackets.lstrip("]}"))
+                if closers < depth:
+                    depth += len(brackets) - 2 * closers
+                    self.pos += cut
+                    # Grow geometrically in case a single long string is still open
+                    if not self.fill(len(self.buf) - self.pos):
+                        raise ValueError("Unexpected end of plan JSON")
+                    continue
+                # The value ends in this chunk: walk its tokens to find where
+                for match in _TOKEN.finditer(text, 0, cut):
+                    token = match.group()
+                    if token[0] == '"':
+                        continue
+                    depth += 1 if token in "[{" else -1
+                    if depth == 0:
+                        self.pos += match.end()
+                        return
+        else:
+            while True:
+                match = _SCALAR.match(self.buf, self.pos)
+                if match.end() < len(self.buf) or not self.fill():
+                    self.pos = match.end()
+                    return
+
+    def _skip_string(self):
+        while True:
+            match = _STRING.match(self.buf, self.pos)
+            if match:
+                self.pos = match.end()
+                return
+            if not self.fill(len(self.buf) - self.pos):
+                raise ValueError("Unterminated string in plan JSON")
+
+
+def iter_resource_changes(stream, header=None):
+    # Yields each element of the top-level "resource_changes" array. If a dict is passed as header,
+    # the small top-level scalars (format_version, terraform_version, ...) seen on the way are stored in it.
+    scanner = _Scanner(stream)
+    scanner.expect("{")
+    if scanner.peek() == "}":
+        return
+    while True:
+        key = scanner.decode()
+        scanner.expect(":")
+        if key == "resource_changes":
+            scanner.expect("[")
+            if scanner.peek() != "]":
+                while True:
+                    yield scanner.decode()
+                    if scanner.peek() == "]":
+                        break
+                    scanner.expect(",")
+            scanner.pos += 1
+        elif header is not None and scanner.peek() not in "[{":
+            header[key] = scanner.decode()
+        else:
+            scanner.skip()
+        if scanner.peek() == "}":
+            return
+        scanner.expect(",")
+
+
+def change_rows(change):
+    # One row per action, so a replacement (delete+create) shows up under both, with its replace_reason
+    for action in change["change"]["actions"]:
+        yield {
+            "action": action,
+            "resource_type": change.get("type"),
+            "resource_name": change.get("name"),
+            "address": change.get("address"),
+            "replace_reason": change.get("action_reason", ""),
+        }
+
+
+class CsvExport:
+    def __init__(self, path):
+        self.f = open(path, "w", newline="")
+        self.writer = csv.DictWriter(self.f, fieldnames=FIELDNAMES)
+        self.writer.writeheader()
+
+    def add(self, row):
+        self.writer.writerow(row)
+
+    def close(self, summary):
+        self.f.close()
+
+
+class XlsxExport:
+    # openpyxl write-only mode streams rows to disk, so the workbook never holds the whole plan
+    def __init__(self, path):
+        try:
+            from openpyxl import Workbook
+        except ImportError as e:
+            raise ImportError("Excel output needs openpyxl: pip install openpyxl (or write a .csv)") from e
+
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+        self.summary_sheet = self.workbook.create_sheet("Summary")
+        self.sheets = {}  # action -> (sheet, rows written, part)
+
+    def _new_sheet(self, action, part=1):
+        sheet = self.workbook.create_sheet(action if part == 1 else f"{action} ({part})")
+        sheet.append(FIELDNAMES)
+        self.sheets[action] = (sheet, 0, part)
+
+    def add(self, row):
+        action = row["action"]
+        if action not in self.sheets:
+            self._new_sheet(action)
+        sheet, rows, part = self.sheets[action]
+        if rows == MAX_SHEET_ROWS:
+            self._new_sheet(action, part + 1)
+            sheet, rows, part = self.sheets[action]
+        sheet.append([row[field] for field in FIELDNAMES])
+        self.sheets[action] = (sheet, rows + 1, part)
+
+    def close(self, summary):
+        # Sheets are created as actions first appear; put them in ACTIONS order after the summary
+        order = {action: i for i, action in enumerate(ACTIONS)}
+        titles = sorted(
+            self.workbook.sheetnames[1:], key=lambda title: (order.get(title.split(" (")[0], len(order)), title)
+        )
+        for position, title in enumerate(titles, start=1):
+            self.workbook.move_sheet(title, position - self.workbook.sheetnames.index(title))
+        for line in summary_rows(summary):
+            self.summary_sheet.append(line)
+        self.workbook.save(self.path)
+
+
+def summary_rows(summary):
+    actions = [a for a in ACTIONS if a in summary["actions"]] + sorted(set(summary["actions"]) - set(ACTIONS))
+    rows = [
+        ["Plan", summary["source"]],
+        ["Terraform version", summary["header"].get("terraform_version", "")],
+        ["Exported at", summary["exported_at"]],
+        [],
+        ["Resource changes", summary["changes"]],
+        [],
+        ["Action", "Rows"],
+    ]
+    rows += [[action, summary["actions"][action]] for action in actions]
+    rows += [["Total", summary["total"]], [], ["Resource type", *actions, "Total"]]
+    for resource_type, counts in sorted(summary["types"].items()):
+        rows.append([resource_type, *(counts.get(action, 0) for action in actions), sum(counts.values())])
+    return rows
+
+
+def open_export(path):
+    return CsvExport(path) if path.endswith(".csv") else XlsxExport(path)
+
+
+def export_plan(stream, output_path, source=""):
+    # total counts rows (one per action), changes counts resource_changes entries
+    summary = {
+        "source": source,
+        "header": {},
+        "actions": {},
+        "types": {},
+        "total": 0,
+        "changes": 0,
+        "exported_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    export = open_export(output_path)
+    for change in iter_resource_changes(stream, summary["header"]):
+        summary["changes"] += 1
+        for row in change_rows(change):
+            export.add(row)
+            summary["actions"][row["action"]] = summary["actions"].get(row["action"], 0) + 1
+            counts = summary["types"].setdefault(row["resource_type"], {})
+            counts[row["action"]] = counts.get(row["action"], 0) + 1
+            summary["total"] += 1
+    export.close(summary)
+    return summary
+
+
+def export_from_terraform(plan_file, output_path, terraform="terraform"):
+    # Reads `terraform show -json` through a pipe: no shell, no plan.json on disk
+    process = subprocess.Popen([terraform, "show", "-json", plan_file], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    error = None
+    try:
+        summary = export_plan(process.stdout, output_path, source=plan_file)
+    except ValueError as e:
+        # A failing terraform show cuts the JSON short; its stderr says why
+        error = e
+    # Drain what follows resource_changes so terraform can exit cleanly
+    while process.stdout.read(READ_SIZE):
+        pass
+    stderr = process.communicate()[1]
+    if process.returncode != 0:
+        raise RuntimeError(f"terraform show failed ({process.returncode}): {stderr.decode(errors='replace').strip()}")
+    if error:
+        raise error
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export Terraform plan resource changes to Excel or CSV.")
+    parser.add_argument("--plan", default="tfplan.binary", help="Binary plan passed to `terraform show -json`")
+    parser.add_argument(
+        "--plan-json", default=None, help="Read an existing plan JSON instead of running terraform ('-' for stdin)"
+    )
+    parser.add_argument("--output", default="plan_export.xlsx", help="*.xlsx, or *.csv for the flat CSV export")
+    parser.add_argument("--terraform", default="terraform", help="terraform executable")
+    args = parser.parse_args()
+
+    try:
+        if args.plan_json == "-":
+            summary = export_plan(sys.stdin.buffer, args.output, source="stdin")
+        elif args.plan_json:
+            with open(args.plan_json, "rb") as f:
+                summary = export_plan(f, args.output, source=args.plan_json)
+        else:
+            print(f"🛠️ Reading plan from terraform show -json {args.plan}...")
+            summary = export_from_terraform(args.plan, args.output, args.terraform)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"❌ Plan export failed: {e}")
+        sys.exit(1)
 
-# Generate fresh plan.json from tfplan.binary
-print("🛠️ Regenerating plan.json...")
-subprocess.run("terraform show -json tfplan.binary > plan.json", shell=True)
-
-# Check file exists and is not empty
-if not os.path.exists("plan.json") or os.path.getsize("plan.json") == 0:
-    print("❌ plan.json is missing or empty. Did terraform show fail?")
-    exit(1)
-
-# Load and convert
-with open("plan.json") as f:
-    plan = json.load(f)
-
-changes = plan.get("resource_changes", [])
-
-with open("plan_export.csv", "w", newline="") as csvfile:
-    fieldnames = ["action", "resource_type", "resource_name", "address", "replace_reason"]
-    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-    writer.writeheader()
-
-    for change in changes:
-        for action in change["change"]["actions"]:
-            writer.writerow({
-                "action": action,
-                "resource_type": change.get("type"),
-                "resource_name": change.get("name"),
-                "address": change.get("address"),
-                "replace_reason": change.get("action_reason", "")
-            })
-
-print("✅ Done! Exported to plan_export.csv")
\ No newline at end of file
+    counts = ", ".join(f"{action}: {count}" for action, count in summary["actions"].items())
+    print(
+        f"✅ Done! Exported {summary['total']} rows for {summary['changes']} resource changes "
+        f"({counts or 'none'}) to {args.output}"
+    )
@@ -1,34 +1,90 @@
 import os
 import json
-from azure.storage.blob import BlobServiceClient
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from devops.terraform.utils.blob_uploader import get_uploader
+from devops.terraform.utils.instrumentation import configure_logging, metrics
 
-# Fix: get absolute path to secrets.json based on script location
-base_dir = os.path.dirname(os.path.abspath(__file__))
-secrets_path = os.path.abspath(os.path.join(base_dir, '..', '..', '..', 'secrets', 'secrets.json'))
-
-with open(secrets_path) as f:
-    secrets = json.load(f)
-
-AZURE_CONN_STR = secrets["AZURE_CONN_STR"]
-CONTAINER = "telemetry-data"  # <- Replace with your actual container if different
+logger = logging.getLogger(__name__)
 
 # Define all layers and domains
 LAYERS = ["bronze", "silver", "gold"]
 DOMAINS = ["telemetry", "maintenance", "weather", "vehicle_usage", "energy_costs"]
 
-def initialize_blob_folders():
-    blob_service_client = BlobServiceClient.from_connection_string(AZURE_CONN_STR)
+# Local record of prefixes already known to exist, so cron runs skip the storage round trips entirely
+MANIFEST_PATH = os.getenv(
+    "BLOB_INIT_MANIFEST",
+    os.path.join(os.path.expanduser("~"), ".cache", "railsight", "blob_init_manifest.json"),
+)
+MANIFEST_TTL_SECONDS = 24 * 60 * 60
+MAX_CREATE_CONCURRENCY = 8
+
+
+def expected_prefixes():
+    return [f"{layer}/{domain}/" for layer in LAYERS for domain in DOMAINS]
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_manifest(target, prefixes, path=MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"target": target, "initialized_at": time.time(), "prefixes": sorted(prefixes)}, f)
+    os.replace(tmp_path, path)
+
+
+def invalidate_manifest(path=MANIFEST_PATH):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def manifest_is_fresh(manifest, target, prefixes, ttl=MANIFEST_TTL_SECONDS):
+    # Valid only for the same account/container, within the TTL, and covering every expected prefix
+    if not manifest or manifest.get("target") != target:
+        return False
+    if time.time() - manifest.get("initialized_at", 0) > ttl:
+        return False
+    return set(prefixes) <= set(manifest.get("prefixes", []))
+
+
+def initialize_blob_folders(force=False, ttl=MANIFEST_TTL_SECONDS, backend=None, manifest_path=MANIFEST_PATH):
+    backend = backend or get_uploader().backend
+    prefixes = expected_prefixes()
+
+    if not force and manifest_is_fresh(load_manifest(manifest_path), backend.target, prefixes, ttl):
+        logger.debug("✔️ Blob folders already initialized (cached)")
+        metrics.count("blob_init", result="cached")
+        return []
+
+    # Reconcile with one delimiter listing per layer instead of a HEAD per layer/domain path
+    with metrics.span("blob_init_list"):
+        existing = set()
+        for layer in LAYERS:
+            existing.update(backend.list_prefixes(f"{layer}/"))
+    missing = [prefix for prefix in prefixes if prefix not in existing]
+
+    if missing:
+        with metrics.span("blob_init_create"), ThreadPoolExecutor(
+            max_workers=min(MAX_CREATE_CONCURRENCY, len(missing))
+        ) as pool:
+            list(pool.map(lambda prefix: backend.upload_bytes(f"{prefix}_init.txt", b"initialized"), missing))
+        for prefix in missing:
+            logger.debug("✅ Created folder: %s", prefix)
+    logger.info("✔️ %d folders already existed, %d created", len(prefixes) - len(missing), len(missing))
+    metrics.count("blob_init", result="reconciled")
 
-    for layer in LAYERS:
-        for domain in DOMAINS:
-            blob_path = f"{layer}/{domain}/_init.txt"
-            blob_client = blob_service_client.get_blob_client(container=CONTAINER, blob=blob_path)
+    save_manifest(backend.target, prefixes, manifest_path)
+    return missing
 
-            if not blob_client.exists():
-                blob_client.upload_blob(b"initialized", overwrite=False)
-                print(f"✅ Created folder: {layer}/{domain}/")
-            else:
-                print(f"✔️ Folder already exists: {layer}/{domain}/")
 
 if __name__ == "__main__":
-    initialize_blob_folders()
\ No newline at end of file
+    configure_logging()
+    initialize_blob_folders(force=True)
@@ -1,35 +1,452 @@
 import os
-from azure.storage.blob import BlobServiceClient
-from datetime import datetime
+import hashlib
 import json
+import logging
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from devops.terraform.utils.instrumentation import metrics
+
+logger = logging.getLogger(__name__)
 
 # Fix: get absolute path to secrets.json based on script location
 base_dir = os.path.dirname(os.path.abspath(__file__))
-secrets_path = os.path.abspath(os.path.join(base_dir, '..', '..', '..', 'secrets', 'secrets.json'))
-
-with open(secrets_path) as f:
-    secrets = json.load(f)
+secrets_path = os.path.abspath(os.path.join(base_dir, "..", "..", "..", "secrets", "secrets.json"))
 
-AZURE_CONN_STR = secrets["AZURE_CONN_STR"]
 CONTAINER = "telemetry-data"
 
-def upload_to_blob(local_path, layer="bronze", domain="telemetry"):
+# Files larger than MAX_SINGLE_PUT_SIZE are sent as staged blocks of BLOCK_SIZE bytes
+MAX_SINGLE_PUT_SIZE = 8 * 1024 * 1024
+BLOCK_SIZE = 4 * 1024 * 1024
+DEFAULT_CONCURRENCY = 8
+
+# Set to a directory to write blobs to the local filesystem instead of Azure (offline runs/benchmarks)
+LOCAL_ROOT_ENV = "BLOB_LOCAL_ROOT"
+
+# Content hashes of files already uploaded, one JSON line per blob, so a file whose bytes were sent
+# before (under any name) is skipped without a round trip. Set to "" to disable.
+UPLOAD_MANIFEST_PATH = os.getenv(
+    "UPLOAD_MANIFEST_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "railsight", "upload_manifest.jsonl"),
+)
+# Blob metadata key holding the file's SHA-256, so the hash can be checked against storage too
+HASH_METADATA_KEY = "sha256"
+
+
+# Takes precedence over secrets.json, e.g. for containers and CI where no secrets file is mounted
+CONN_STR_ENV = "AZURE_CONN_STR"
+
+
+def load_connection_string():
+    # Read on first upload (via get_uploader), never at import, so generation works without credentials
+    conn_str = os.getenv(CONN_STR_ENV)
+    if conn_str:
+        return conn_str
+    try:
+        with open(secrets_path) as f:
+            return json.load(f)[CONN_STR_ENV]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        # ValueError: truncated or malformed JSON; TypeError: valid JSON that is not an object
+        raise RuntimeError(
+            f"No Azure connection string: set {CONN_STR_ENV}, add it to {secrets_path}, "
+            f"or set {LOCAL_ROOT_ENV} to upload to a local folder instead"
+        ) from e
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def block_ids(digest, size, block_size=BLOCK_SIZE):
+    # Derived from the content hash, so a resumed upload only reuses blocks staged for the same bytes;
+    # Azure requires every block id of a blob to have the same length
+    n_blocks = max(1, -(-size // block_size))
+    return [f"{digest[:32]}-{index:06d}" for index in range(n_blocks)]
+
+
+def blob_path_for(local_path, layer, domain):
     date_parts = local_path.split(os.sep)[-4:-1]  # [YYYY, MM, DD]
-    print(f"date_parts: {date_parts}")
     filename = os.path.basename(local_path)
-    print(f"filename: {filename}")
-    blob_path = f"{layer}/{domain}/{'/'.join(date_parts)}/{filename}"
-    print(f"Blob path: {blob_path}")
+    return f"{layer}/{domain}/{'/'.join(date_parts)}/{filename}"
 
-    blob_service_client = BlobServiceClient.from_connection_string(AZURE_CONN_STR)
-    blob_client = blob_service_client.get_blob_client(container=CONTAINER, blob=blob_path)
-    print(f"Blob client: {blob_client}")
 
-    if blob_client.exists():
-        print(f"⚠️ File already exists in Azure Blob: {blob_path}")
-    else:
-        with open(local_path, "rb") as data:
-            blob_client.upload_blob(data)
-        print(f"✅ Uploaded to blob: {blob_path}")
+class AzureBlobBackend:
+    # One BlobServiceClient and one HTTP connection pool shared by every upload.
+    # Point conn_str at Azurite ("UseDevelopmentStorage=true") to run against a local emulator.
+    def __init__(self, conn_str, container=CONTAINER, max_connections=DEFAULT_CONCURRENCY):
+        import requests
+        from azure.core.pipeline.transport import RequestsTransport
+        from azure.storage.blob import BlobServiceClient
+
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        self.service = BlobServiceClient.from_connection_string(
+            conn_str,
+            transport=RequestsTransport(session=session, session_owner=False),
+            max_single_put_size=MAX_SINGLE_PUT_SIZE,
+            max_block_size=BLOCK_SIZE,
+        )
+        self.container = self.service.get_container_client(container)
+        self.target = self.container.url
+
+    def upload(self, blob_path, local_path, max_concurrency=1, metadata=None):
+        # Conditional create instead of exists() + upload: one round trip, and no race between the two
+        from azure.core.exceptions import ResourceExistsError
+
+        try:
+            with open(local_path, "rb") as data:
+                self.container.upload_blob(
+                    blob_path, data, overwrite=False, max_concurrency=max_concurrency, metadata=metadata
+                )
+        except ResourceExistsError:
+            return False
+        return True
+
+    def metadata(self, blob_path):
+        # None if the blob does not exist
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            return self.container.get_blob_client(blob_path).get_blob_properties().metadata
+        except ResourceNotFoundError:
+            return None
+
+    def staged_blocks(self, blob_path):
+        # Uncommitted blocks left by an interrupted upload; Azure keeps them for a week
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            _, uncommitted = self.container.get_blob_client(blob_path).get_block_list("uncommitted")
+        except ResourceNotFoundError:
+            return set()
+        return {block.id for block in uncommitted}
+
+    def stage_block(self, blob_path, block_id, data):
+        self.container.get_blob_client(blob_path).stage_block(block_id, data, length=len(data))
+
+    def commit_blocks(self, blob_path, ids, metadata=None):
+        # If-None-Match: * so a blob that appeared meanwhile is left alone, as with upload()
+        from azure.core import MatchConditions
+        from azure.core.exceptions import ResourceExistsError, ResourceModifiedError
+        from azure.storage.blob import BlobBlock
+
+        try:
+            self.container.get_blob_client(blob_path).commit_block_list(
+                [BlobBlock(block_id=block_id) for block_id in ids],
+                metadata=metadata,
+                match_condition=MatchConditions.IfMissing,
+            )
+        except (ResourceExistsError, ResourceModifiedError):
+            return False
+        return True
+
+    def upload_bytes(self, blob_path, data):
+        from azure.core.exceptions import ResourceExistsError
+
+        try:
+            self.container.upload_blob(blob_path, data, overwrite=False)
+        except ResourceExistsError:
+            return False
+        return True
+
+    def list_prefixes(self, prefix):
+        # One hierarchical listing: the immediate "sub-folders" of prefix, without walking their contents
+        from azure.storage.blob import BlobPrefix
+
+        return [
+            item.name
+            for item in self.container.walk_blobs(name_starts_with=prefix, delimiter="/")
+            if isinstance(item, BlobPrefix)
+        ]
+
+    def close(self):
+        self.service.close()
+
+
+class LocalBlobBackend:
+    # Filesystem stand-in with the same interface; blobs land under <root>/<container>/<blob_path>
+    def __init__(self, root, container=CONTAINER):
+        self.root = os.path.join(root, container)
+        self.target = os.path.abspath(self.root)
+
+    def _path(self, blob_path, *under):
+        # Metadata and staged blocks live in their own trees so blob folders only hold blobs
+        return os.path.join(self.root, *under, *blob_path.split("/"))
 
-        
\ No newline at end of file
+    def _write_metadata(self, blob_path, metadata):
+        if metadata:
+            path = self._path(blob_path, ".metadata") + ".json"
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(metadata, f)
+
+    def upload(self, blob_path, local_path, max_concurrency=1, metadata=None):
+        target = self._path(blob_path)
+        if os.path.exists(target):
+            return False
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Copy to a private temp name, then hard-link into place so readers never see a partial blob
+        partial = f"{target}.{threading.get_ident()}.partial"
+        try:
+            with open(local_path, "rb") as data, open(partial, "wb") as out:
+                shutil.copyfileobj(data, out, BLOCK_SIZE)
+            os.link(partial, target)
+        except FileExistsError:
+            return False
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        self._write_metadata(blob_path, metadata)
+        return True
+
+    def metadata(self, blob_path):
+        if not os.path.exists(self._path(blob_path)):
+            return None
+        try:
+            with open(self._path(blob_path, ".metadata") + ".json") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def staged_blocks(self, blob_path):
+        folder = self._path(blob_path, ".staging")
+        if not os.path.isdir(folder):
+            return set()
+        return {name for name in os.listdir(folder) if not name.endswith(".partial")}
+
+    def stage_block(self, blob_path, block_id, data):
+        folder = self._path(blob_path, ".staging")
+        os.makedirs(folder, exist_ok=True)
+        # Renamed into place once complete, so a crash mid-write never leaves a block that looks staged
+        partial = os.path.join(folder, f"{block_id}.{threading.get_ident()}.partial")
+        with open(partial, "wb") as out:
+            out.write(data)
+        os.replace(partial, os.path.join(folder, block_id))
+
+    def commit_blocks(self, blob_path, ids, metadata=None):
+        target = self._path(blob_path)
+        if os.path.exists(target):
+            return False
+        folder = self._path(blob_path, ".staging")
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        partial = f"{target}.{threading.get_ident()}.partial"
+        try:
+            with open(partial, "wb") as out:
+                for block_id in ids:
+                    with open(os.path.join(folder, block_id), "rb") as block:
+                        shutil.copyfileobj(block, out, BLOCK_SIZE)
+            os.link(partial, target)
+        except FileExistsError:
+            return False
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        self._write_metadata(blob_path, metadata)
+        # Like Azure, committing discards the staged blocks
+        shutil.rmtree(folder, ignore_errors=True)
+        return True
+
+    def upload_bytes(self, blob_path, data):
+        target = self._path(blob_path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            with open(target, "xb") as out:
+                out.write(data)
+        except FileExistsError:
+            return False
+        return True
+
+    def list_prefixes(self, prefix):
+        folder = self._path(prefix.strip("/"))
+        if not os.path.isdir(folder):
+            return []
+        return [f"{prefix}{name}/" for name in os.listdir(folder) if os.path.isdir(os.path.join(folder, name))]
+
+    def close(self):
+        pass
+
+
+class UploadManifest:
+    # (target, layer/domain, sha256) -> blob path. Append-only JSON lines, so concurrent writers
+    # (CLI worker processes, the watcher) only ever add records and a torn last line is skipped.
+    def __init__(self, path=UPLOAD_MANIFEST_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = self._load()
+
+    def _load(self):
+        entries = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        entries[(entry["target"], entry["prefix"], entry["sha256"])] = entry["blob_path"]
+                    except (ValueError, KeyError):
+                        continue
+        return entries
+
+    def get(self, target, prefix, digest):
+        return self.entries.get((target, prefix, digest))
+
+    def record(self, target, prefix, digest, blob_path, size):
+        line = (
+            json.dumps(
+                {
+                    "target": target,
+                    "prefix": prefix,
+                    "sha256": digest,
+                    "blob_path": blob_path,
+                    "bytes": size,
+                    "at": time.time(),
+                }
+            )
+            + "\n"
+        )
+        with self._lock:
+            self.entries[(target, prefix, digest)] = blob_path
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(line)
+
+
+class BlobUploader:
+    def __init__(self, backend, max_concurrency=DEFAULT_CONCURRENCY, manifest=None):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.manifest = manifest
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def upload(self, local_path, layer="bronze", domain="telemetry"):
+        blob_path = blob_path_for(local_path, layer, domain)
+        start = time.perf_counter()
+        size = os.path.getsize(local_path)
+        digest = file_sha256(local_path)
+        prefix = f"{layer}/{domain}"
+        known = self.manifest.get(self.backend.target, prefix, digest) if self.manifest else None
+        if known:
+            # Same bytes already in storage (timestamped filenames make re-runs look new): no request at all
+            status, blob_path = "duplicate", known
+        else:
+            metadata = {HASH_METADATA_KEY: digest}
+            # Large files go as resumable staged blocks; small ones as a single put
+            if size > MAX_SINGLE_PUT_SIZE:
+                uploaded = self._upload_blocks(blob_path, local_path, digest, size, metadata)
+            else:
+                uploaded = self.backend.upload(blob_path, local_path, metadata=metadata)
+            status = "uploaded" if uploaded else "exists"
+            if self.manifest and (uploaded or self._stored_hash(blob_path) == digest):
+                self.manifest.record(self.backend.target, prefix, digest, blob_path, size)
+        result = {
+            "blob_path": blob_path,
+            "status": status,
+            "bytes": size if status == "uploaded" else 0,
+            "sha256": digest,
+            "seconds": time.perf_counter() - start,
+        }
+        metrics.observe("upload", result["seconds"], layer=layer, domain=domain, status=result["status"])
+        metrics.count("upload_bytes", result["bytes"], layer=layer, domain=domain)
+        return result
+
+    def _stored_hash(self, blob_path):
+        return (self.backend.metadata(blob_path) or {}).get(HASH_METADATA_KEY)
+
+    def _upload_blocks(self, blob_path, local_path, digest, size, metadata):
+        # Blocks staged by an interrupted attempt are kept, so a retry only sends what is missing
+        if self.backend.metadata(blob_path) is not None:
+            return False
+        ids = block_ids(digest, size)
+        staged = self.backend.staged_blocks(blob_path)
+        missing = [(index, block_id) for index, block_id in enumerate(ids) if block_id not in staged]
+        if len(missing) < len(ids):
+            logger.info("⏯️ Resuming %s: %d of %d blocks already staged", blob_path, len(ids) - len(missing), len(ids))
+            metrics.count("upload_blocks_resumed", len(ids) - len(missing))
+
+        def stage(item):
+            index, block_id = item
+            with open(local_path, "rb") as f:
+                f.seek(index * BLOCK_SIZE)
+                self.backend.stage_block(blob_path, block_id, f.read(BLOCK_SIZE))
+
+        # A pool per file rather than the shared one, which may already be running this upload
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(missing)))) as pool:
+            list(pool.map(stage, missing))
+        return self.backend.commit_blocks(blob_path, ids, metadata)
+
+    def upload_many(self, items):
+        # items: iterable of (local_path, layer, domain); at most max_concurrency uploads in flight
+        futures = [self._executor().submit(self._upload_safely, *item) for item in items]
+        return [future.result() for future in futures]
+
+    def _upload_safely(self, local_path, layer, domain):
+        try:
+            return self.upload(local_path, layer, domain)
+        except Exception as e:
+            logger.error("❌ Upload failed for %s: %s", local_path, e)
+            metrics.count("upload_failures", layer=layer, domain=domain)
+            return {
+                "blob_path": blob_path_for(local_path, layer, domain),
+                "status": "failed",
+                "bytes": 0,
+                "sha256": None,
+                "seconds": 0.0,
+                "error": str(e),
+            }
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="blob-upload")
+            return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        self.backend.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default_uploader = None
+_default_lock = threading.Lock()
+
+
+def get_uploader():
+    # Process-wide uploader, created on first use so the client and its connections are reused
+    global _default_uploader
+    with _default_lock:
+        if _default_uploader is None:
+            local_root = os.getenv(LOCAL_ROOT_ENV)
+            if local_root:
+                backend = LocalBlobBackend(local_root)
+            else:
+                backend = AzureBlobBackend(load_connection_string())
+            manifest = UploadManifest(UPLOAD_MANIFEST_PATH) if UPLOAD_MANIFEST_PATH else None
+            _default_uploader = BlobUploader(backend, manifest=manifest)
+        return _default_uploader
+
+
+def upload_to_blob(local_path, layer="bronze", domain="telemetry"):
+    result = get_uploader().upload(local_path, layer=layer, domain=domain)
+    # Per-file lines are debug-level so bulk runs aren't paced by console output
+    if result["status"] == "exists":
+        logger.info("⚠️ File already exists in Azure Blob: %s", result["blob_path"])
+    elif result["status"] == "duplicate":
+        logger.info("♻️ Same content already uploaded as %s, skipped %s", result["blob_path"], local_path)
+    else:
+        logger.debug("✅ Uploaded to blob: %s (%.3fs)", result["blob_path"], result["seconds"])
+    return result
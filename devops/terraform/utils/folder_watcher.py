@@ -1,29 +1,270 @@
 import os
+import json
+import logging
+import queue
+import argparse
+import threading
 import time
+from collections import deque
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-from utils.blob_uploader import upload_to_blob
+from devops.terraform.utils.blob_uploader import BlobUploader, get_uploader
+from devops.terraform.utils.instrumentation import configure_logging, metrics
+
+logger = logging.getLogger(__name__)
 
 WATCH_FOLDER = "data_simulator/landing"
+WATCH_EXTENSIONS = (".json", ".json.gz", ".parquet")
+
+# Paths already uploaded, appended one JSON line per file so restarts don't re-send them
+STATE_PATH = os.getenv(
+    "WATCHER_STATE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "railsight", "watcher_state.jsonl"),
+)
+
+
+def is_landing_file(path):
+    return path.endswith(WATCH_EXTENSIONS)
+
+
+def domain_of(path):
+    return path.split(os.sep)[-2]  # get domain from folder path
+
+
+class UploadPipeline:
+    # Watchdog threads only enqueue paths; one dispatcher thread waits for files to stop changing,
+    # groups them into batches and hands each batch to the uploader's worker pool.
+    def __init__(
+        self,
+        uploader,
+        layer="bronze",
+        queue_size=1000,
+        settle_seconds=2.0,
+        batch_size=50,
+        batch_window=1.0,
+        poll_interval=0.25,
+        state_path=STATE_PATH,
+    ):
+        self.uploader = uploader
+        self.layer = layer
+        self.settle_seconds = settle_seconds
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.poll_interval = poll_interval
+        self.state_path = state_path
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.pending = {}  # path -> (size, mtime_ns, last_change)
+        self.detected = {}  # path -> when the dispatcher first saw it, for the end-to-end latency timer
+        self.tracked = set()  # queued or pending, so repeated modify events don't flood the queue
+        self.tracked_lock = threading.Lock()
+        self.uploaded = self._load_state()
+
+        self.latencies = deque(maxlen=1000)
+        self.counters = {"uploaded": 0, "exists": 0, "duplicate": 0, "failed": 0, "dropped": 0, "batches": 0}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _load_state(self):
+        uploaded = set()
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                for line in f:
+                    try:
+                        uploaded.add(json.loads(line)["path"])
+                    except (ValueError, KeyError):
+                        continue  # tolerate a torn last line after a crash
+        return uploaded
+
+    def _record_state(self, paths):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        with open(self.state_path, "a") as f:
+            for path in paths:
+                f.write(json.dumps({"path": path, "at": time.time()}) + "\n")
+
+    def enqueue(self, path):
+        path = os.path.abspath(path)
+        if not is_landing_file(path) or path in self.uploaded:
+            return
+        with self.tracked_lock:
+            if path in self.tracked:
+                return
+            self.tracked.add(path)
+        try:
+            self.queue.put(path, timeout=1.0)
+        except queue.Full:
+            # Not lost for good: the startup scan picks up anything absent from the state file
+            with self.tracked_lock:
+                self.tracked.discard(path)
+            self.counters["dropped"] += 1
+            metrics.count("watcher_dropped", layer=self.layer)
+            logger.warning("⚠️ Upload queue full, dropped event for %s", path)
+
+    def scan(self, folder):
+        for root, _, files in os.walk(folder):
+            for name in files:
+                self.enqueue(os.path.join(root, name))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="upload-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _drain_queue(self):
+        try:
+            path = self.queue.get(timeout=self.poll_interval)
+        except queue.Empty:
+            return
+        while True:
+            now = time.monotonic()
+            self.pending.setdefault(path, (-1, -1, now))
+            self.detected.setdefault(path, now)
+            try:
+                path = self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def _settled_files(self):
+        # A file is ready once its size and mtime have not changed for settle_seconds
+        now = time.monotonic()
+        ready = []
+        for path, (size, mtime, last_change) in list(self.pending.items()):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                del self.pending[path]
+                self.detected.pop(path, None)
+                with self.tracked_lock:
+                    self.tracked.discard(path)
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime):
+                self.pending[path] = (stat.st_size, stat.st_mtime_ns, now)
+            elif now - last_change >= self.settle_seconds:
+                del self.pending[path]
+                ready.append(path)
+        return ready
+
+    def _run(self):
+        batch, batch_started = [], None
+        while not self._stop.is_set():
+            self._drain_queue()
+            ready = self._settled_files()
+            if ready and not batch:
+                batch_started = time.monotonic()
+            batch.extend(ready)
+            while len(batch) >= self.batch_size:
+                self._upload_batch(batch[: self.batch_size])
+                batch = batch[self.batch_size :]
+            if batch and time.monotonic() - batch_started >= self.batch_window:
+                self._upload_batch(batch)
+                batch = []
+        if batch:
+            self._upload_batch(batch)
+
+    def _upload_batch(self, batch):
+        with metrics.span("upload_batch", layer=self.layer):
+            results = self.uploader.upload_many((path, self.layer, domain_of(path)) for path in batch)
+        done = []
+        now = time.monotonic()
+        for path, result in zip(batch, results):
+            self.counters[result["status"]] += 1
+            detected = self.detected.pop(path, now)
+            if result["status"] != "failed":
+                self.latencies.append(result["seconds"])
+                # Detection to upload done: settle wait, batching and the upload itself
+                metrics.observe("watcher_latency", now - detected, layer=self.layer)
+                done.append(path)
+        self._record_state(done)
+        self.uploaded.update(done)
+        with self.tracked_lock:
+            self.tracked.difference_update(batch)
+        self.counters["batches"] += 1
+        logger.info("📦 Uploaded batch of %d files (%d ok)", len(batch), len(done))
+
+    def metrics(self):
+        latencies = sorted(self.latencies)
+        return {
+            "queue_depth": self.queue.qsize(),
+            "pending": len(self.pending),
+            **self.counters,
+            "latency_avg_s": sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_p95_s": latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+        }
+
+    def record_metrics(self):
+        # Current readings as gauges on the shared registry, so the JSON lines and Prometheus exports carry
+        # them; each file's upload time is also the uploader's "upload" timer
+        readings = self.metrics()
+        gauges = {
+            "queue_depth": "watcher_queue_depth",
+            "pending": "watcher_pending_files",
+            "latency_avg_s": "watcher_upload_latency_avg_seconds",
+            "latency_p95_s": "watcher_upload_latency_p95_seconds",
+        }
+        for reading, name in gauges.items():
+            metrics.gauge(name, readings[reading], layer=self.layer)
+        return readings
+
 
 class NewFileHandler(FileSystemEventHandler):
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+
     def on_created(self, event):
-        if event.src_path.endswith(".json"):
-            print(f"📦 New JSON file detected: {event.src_path}")
-            try:
-                domain = event.src_path.split(os.sep)[-2]  # get domain from folder path
-                upload_to_blob(event.src_path, layer="bronze", domain=domain)
-            except Exception as e:
-                print(f"❌ Failed to detect domain or upload file: {e}")
+        if not event.is_directory:
+            self.pipeline.enqueue(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.pipeline.enqueue(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.pipeline.enqueue(event.dest_path)
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch the landing folder and upload new files in batches.")
+    parser.add_argument("--folder", default=WATCH_FOLDER)
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent uploads per batch")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--batch-window", type=float, default=1.0, help="Max seconds to wait before flushing a batch")
+    parser.add_argument("--settle-seconds", type=float, default=2.0, help="How long a file must be unchanged")
+    parser.add_argument("--queue-size", type=int, default=1000)
+    parser.add_argument("--metrics-interval", type=float, default=30.0)
+    args = parser.parse_args()
+    configure_logging()
+
+    default = get_uploader()
+    uploader = BlobUploader(default.backend, max_concurrency=args.workers, manifest=default.manifest)
+    pipeline = UploadPipeline(
+        uploader,
+        queue_size=args.queue_size,
+        settle_seconds=args.settle_seconds,
+        batch_size=args.batch_size,
+        batch_window=args.batch_window,
+    )
+    pipeline.start()
+
     observer = Observer()
-    observer.schedule(NewFileHandler(), path=WATCH_FOLDER, recursive=True)
+    observer.schedule(NewFileHandler(pipeline), path=args.folder, recursive=True)
     observer.start()
-    print("👀 Watching folder for new JSON files... Ctrl+C to stop.")
+    # Catch up on anything written while the watcher was down
+    pipeline.scan(args.folder)
+    logger.info("👀 Watching folder for new landing files... Ctrl+C to stop.")
     try:
         while True:
-            time.sleep(1)
+            time.sleep(args.metrics_interval)
+            logger.info("📊 %s", pipeline.record_metrics())
+            metrics.export()  # RAILSIGHT_METRICS_PATH, e.g. a .prom file for the textfile collector
     except KeyboardInterrupt:
         observer.stop()
     observer.join()
+    pipeline.stop()
+    uploader.close()
+    pipeline.record_metrics()
+    metrics.export()
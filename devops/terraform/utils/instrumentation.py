@@ -0,0 +1,222 @@
+"""
+Lightweight timing and counter instrumentation shared by the simulator,
+the uploader and the Databricks pipeline.
+
+    from devops.terraform.utils.instrumentation import metrics
+
+    with metrics.span("generate", domain="telemetry"):
+        df = generate_telemetry()
+    metrics.count("rows", len(df), domain="telemetry")
+
+Spans, counters and gauges are aggregated in memory (no I/O on the hot path) and
+exported on demand as JSON lines or Prometheus text. Progress messages go
+through the standard logging module; configure_logging() sets it up for
+entry points, honouring RAILSIGHT_LOG_LEVEL.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+LOG_LEVEL_ENV = "RAILSIGHT_LOG_LEVEL"
+# Where entry points export metrics on exit: *.prom for Prometheus text, anything else for JSON lines
+METRICS_PATH_ENV = "RAILSIGHT_METRICS_PATH"
+PROMETHEUS_PREFIX = "railsight"
+
+logger = logging.getLogger(__name__)
+
+
+def configure_logging(level=None):
+    # Only entry points call this; library modules just use logging.getLogger(__name__)
+    level = (level or os.getenv(LOG_LEVEL_ENV, "INFO")).upper()
+    logging.basicConfig(level=level, format="%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+    logging.getLogger().setLevel(level)
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+class Metrics:
+    def __init__(self, max_spans=10_000):
+        self._lock = threading.Lock()
+        self.counters = {}  # (name, labels) -> value
+        self.timers = {}  # (name, labels) -> [count, total seconds, max seconds]
+        self.gauges = {}  # (name, labels) -> last value
+        self.spans = deque(maxlen=max_spans)  # most recent individual spans, for the JSON lines export
+
+    def count(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name, value, **labels):
+        # Last value wins, e.g. a queue depth sampled periodically
+        key = _key(name, labels)
+        with self._lock:
+            self.gauges[key] = value
+
+    def observe(self, name, seconds, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            timer = self.timers.setdefault(key, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    @contextmanager
+    def span(self, name, **labels):
+        start_wall, start = time.time(), time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            seconds = time.perf_counter() - start
+            self.observe(name, seconds, **labels)
+            with self._lock:
+                self.spans.append({"span": name, "labels": labels, "start": start_wall, "seconds": seconds, "ok": ok})
+            logger.debug("%s %s took %.3fs", name, labels, seconds)
+
+    def timed_iter(self, iterable, name, **labels):
+        # Times each next() separately, e.g. the generator work behind a lazy chunk iterator
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.observe(name, time.perf_counter() - start, **labels)
+            yield item
+
+    def snapshot(self):
+        with self._lock:
+            series = [
+                {"type": "counter", "name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self.counters.items()
+            ]
+            series += [
+                {"type": "timer", "name": name, "labels": dict(labels), "count": count, "sum_s": total, "max_s": peak}
+                for (name, labels), (count, total, peak) in self.timers.items()
+            ]
+            series += [
+                {"type": "gauge", "name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self.gauges.items()
+            ]
+        return series
+
+    def drain(self):
+        # Snapshot and reset, e.g. to ship a worker process's metrics back to the parent. The individual
+        # spans go along too, so the parent's JSON lines export still has them
+        with self._lock:
+            spans = [{"type": "span", **span} for span in self.spans]
+        series = spans + self.snapshot()
+        self.reset()
+        return series
+
+    def merge(self, series):
+        with self._lock:
+            for item in series:
+                if item["type"] == "span":
+                    # Already counted in the timer series that come with it
+                    self.spans.append({key: value for key, value in item.items() if key != "type"})
+                    continue
+                key = (item["name"], tuple(sorted(item["labels"].items())))
+                if item["type"] == "counter":
+                    self.counters[key] = self.counters.get(key, 0) + item["value"]
+                elif item["type"] == "gauge":
+                    self.gauges[key] = item["value"]
+                else:
+                    timer = self.timers.setdefault(key, [0, 0.0, 0.0])
+                    timer[0] += item["count"]
+                    timer[1] += item["sum_s"]
+                    timer[2] = max(timer[2], item["max_s"])
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.timers.clear()
+            self.gauges.clear()
+            self.spans.clear()
+
+    def write_jsonl(self, path):
+        # Appends the recorded spans, then one line per aggregated series, all stamped with this export
+        exported_at = time.time()
+        with self._lock:
+            spans = list(self.spans)
+            self.spans.clear()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a") as f:
+            for item in [{"type": "span", **span} for span in spans] + self.snapshot():
+                f.write(json.dumps({"exported_at": exported_at, **item}) + "\n")
+
+    def prometheus_text(self):
+        # Samples of one metric family must be contiguous, so series are grouped by family first
+        families = {}
+        for item in self.snapshot():
+            labels = ",".join(f'{k}="{v}"' for k, v in sorted(item["labels"].items()))
+            labels = f"{{{labels}}}" if labels else ""
+            base = f"{PROMETHEUS_PREFIX}_{item['name']}"
+            if item["type"] == "counter":
+                families.setdefault((f"{base}_total", "counter"), []).append(f"{base}_total{labels} {item['value']}")
+            elif item["type"] == "gauge":
+                families.setdefault((base, "gauge"), []).append(f"{base}{labels} {item['value']}")
+            else:
+                families.setdefault((f"{base}_seconds", "summary"), []).extend(
+                    [
+                        f"{base}_seconds_count{labels} {item['count']}",
+                        f"{base}_seconds_sum{labels} {item['sum_s']:.6f}",
+                    ]
+                )
+                families.setdefault((f"{base}_seconds_max", "gauge"), []).append(
+                    f"{base}_seconds_max{labels} {item['max_s']:.6f}"
+                )
+        lines = []
+        for (metric, kind), samples in sorted(families.items()):
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        # Whole-file replace, as the node_exporter textfile collector expects
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    def export(self, path=None):
+        path = path or os.getenv(METRICS_PATH_ENV)
+        if not path:
+            return None
+        if path.endswith(".prom"):
+            self.write_prometheus(path)
+        else:
+            self.write_jsonl(path)
+        logger.info("📊 Metrics exported to %s", path)
+        return path
+
+    def summary(self):
+        # Human-readable one line per timer/counter, slowest timers first
+        items = self.snapshot()
+        timers = sorted((i for i in items if i["type"] == "timer"), key=lambda i: -i["sum_s"])
+        lines = [
+            f"{i['name']:<12} {_labels(i):<40} {i['count']:>6}x  {i['sum_s']:>9.3f}s  max {i['max_s']:.3f}s"
+            for i in timers
+        ]
+        lines += [f"{i['name']:<12} {_labels(i):<40} {i['value']:>14,}" for i in items if i["type"] == "counter"]
+        lines += [f"{i['name']:<12} {_labels(i):<40} {i['value']:>14,.3f}" for i in items if i["type"] == "gauge"]
+        return "\n".join(lines)
+
+
+def _labels(item):
+    return " ".join(f"{k}={v}" for k, v in sorted(item["labels"].items()))
+
+
+# Process-wide registry
+metrics = Metrics()
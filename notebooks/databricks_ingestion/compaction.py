@@ -0,0 +1,74 @@
+"""
+compaction.py
+
+Small-file compaction for the Bronze/Silver/Gold tables. Every run appends
+a few small files per table (one set per micro-batch), so the file count,
+and with it listing and scan time, grows with the number of simulator
+runs. compact_table merges the date partitions a run wrote into
+right-sized files: OPTIMIZE (ZORDER BY the cluster column) on Delta, and a
+rewrite of just those partitions on plain Parquet tables, as in local runs.
+The simulators backfill (energy costs cover a week, vehicle usage 72h), so
+those are not only the most recent dates.
+"""
+
+from pyspark.sql import functions as F
+
+# Upper bound per output file for the Parquet rewrite (Delta sizes files itself)
+MAX_RECORDS_PER_FILE = 2_000_000
+
+
+def table_provider(spark, table):
+    rows = spark.sql(f"DESCRIBE TABLE EXTENDED {table}").collect()
+    return next((row.data_type.lower() for row in rows if row.col_name == "Provider"), None)
+
+
+def compact_table(spark, table, dates=None, cluster_by=None, buckets=None):
+    # dates: the date partitions to compact, e.g. those this run appended to; None compacts every partition.
+    # Tables without a date column are always compacted whole.
+    if "date" not in spark.read.table(table).columns:
+        dates = None
+    elif dates is not None:
+        dates = sorted(str(d) for d in dates)
+        if not dates:
+            return {"table": table, "files_before": 0, "files_after": 0}
+
+    if table_provider(spark, table) == "delta":
+        # OPTIMIZE only rewrites files below the target size, so repeated runs are cheap
+        statement = f"OPTIMIZE {table}"
+        if dates:
+            statement += " WHERE date IN (" + ", ".join(f"'{d}'" for d in dates) + ")"
+        if cluster_by:
+            statement += f" ZORDER BY ({cluster_by})"
+        result = spark.sql(statement).select("metrics.numFilesRemoved", "metrics.numFilesAdded").first()
+        return {"table": table, "files_before": result[0], "files_after": result[1]}
+    # Only the clustered tables are bucketed; everything else compacts to one file per partition
+    return rewrite_partitions(spark, table, dates, buckets if cluster_by else None)
+
+
+def select_partitions(df, dates):
+    return df.filter(F.col("date").cast("string").isin(dates)) if dates else df
+
+
+def rewrite_partitions(spark, table, dates=None, buckets=None):
+    df = select_partitions(spark.read.table(table), dates)
+    partitioned = "date" in df.columns
+    files_before = len(df.inputFiles())
+    # One file per date partition, per bucket when the table is bucketed
+    target = (df.select("date").distinct().count() if partitioned else 1) * (buckets or 1)
+    if files_before <= target:
+        return {"table": table, "files_before": files_before, "files_after": files_before}
+
+    # localCheckpoint cuts the lineage back to the files being replaced, which Spark won't overwrite while reading
+    rows = df.localCheckpoint()
+    rows = rows.repartition("date") if partitioned else rows.coalesce(1)
+    previous = spark.conf.get("spark.sql.sources.partitionOverwriteMode")
+    # Dynamic: only partitions present in rows are replaced; it is a session setting, not a writer option
+    spark.conf.set("spark.sql.sources.partitionOverwriteMode", "dynamic")
+    try:
+        rows.write.option("maxRecordsPerFile", MAX_RECORDS_PER_FILE).insertInto(table, overwrite=True)
+    finally:
+        spark.conf.set("spark.sql.sources.partitionOverwriteMode", previous)
+    spark.catalog.refreshTable(table)
+
+    compacted = select_partitions(spark.read.table(table), dates)
+    return {"table": table, "files_before": files_before, "files_after": len(compacted.inputFiles())}
@@ -0,0 +1,88 @@
+"""
+explainability.py
+
+Tree SHAP explanations for the telemetry fault model over a stratified,
+bounded sample. The forest exported by model_scoring.export_forest is
+handed to shap.TreeExplainer as a dict model, and attributions are
+computed on the executors with mapInPandas, so the driver only ever holds
+per-class counts and the forest itself.
+"""
+
+import numpy as np
+from pyspark.sql import Window
+from pyspark.sql import functions as F
+
+EXPLANATION_SCHEMA = (
+    "unit_id string, timestamp timestamp, fault_code long, predicted_fault_code int, "
+    "rank int, feature string, feature_value double, shap_value double"
+)
+
+
+def shap_tree_model(forest):
+    # shap sums tree outputs, so each tree's class probabilities are scaled by 1/n_trees to match
+    # Spark's averaged probability; shap also wants NumPy arrays rather than JSON lists
+    scale = 1.0 / len(forest["trees"])
+    trees = []
+    for tree in forest["trees"]:
+        arrays = {key: np.asarray(value) for key, value in tree.items()}
+        arrays["values"] = arrays["values"].astype(np.float64) * scale
+        arrays["thresholds"] = arrays["thresholds"].astype(np.float64)
+        arrays["node_sample_weight"] = arrays["node_sample_weight"].astype(np.float64)
+        trees.append(arrays)
+    return {"trees": trees}
+
+
+def stratified_sample(df, label, max_rows, seed=42):
+    # At most max_rows in total, split evenly across classes so rare fault codes are represented.
+    # sampleBy oversamples slightly and the per-class row_number trims to an exact bound.
+    counts = {row[label]: row["count"] for row in df.groupBy(label).count().collect()}
+    per_class = max(1, max_rows // max(1, len(counts)))
+    fractions = {value: min(1.0, 1.2 * per_class / count) for value, count in counts.items()}
+    ranked = df.sampleBy(label, fractions, seed).withColumn(
+        "_rank", F.row_number().over(Window.partitionBy(label).orderBy(F.rand(seed)))
+    )
+    return ranked.filter(F.col("_rank") <= per_class).drop("_rank")
+
+
+def explain(sample_df, forest, top_k=3):
+    # Top-k attributions per row for the class the forest predicts, one output row per (row, rank)
+    model = shap_tree_model(forest)
+    feature_names = list(forest["feature_names"])
+
+    def explain_partition(batches):
+        import pandas as pd
+        import shap
+
+        explainer = shap.TreeExplainer(model)  # once per task, reused across Arrow batches
+        for pdf in batches:
+            if pdf.empty:
+                continue
+            X = pdf[feature_names].to_numpy(dtype=np.float64)
+            values = explainer.shap_values(X)
+            values = np.stack(values, axis=-1) if isinstance(values, list) else np.asarray(values)
+            predicted = (np.asarray(explainer.expected_value) + values.sum(axis=1)).argmax(axis=1)
+            rows = np.arange(len(X))
+            for_predicted = values[rows, :, predicted]
+            top = np.argsort(-np.abs(for_predicted), axis=1)[:, :top_k]
+            yield pd.DataFrame(
+                {
+                    "unit_id": np.repeat(pdf["unit_id"].to_numpy(), top.shape[1]),
+                    "timestamp": np.repeat(pdf["timestamp"].to_numpy(), top.shape[1]),
+                    "fault_code": np.repeat(pdf["fault_code"].to_numpy(), top.shape[1]),
+                    "predicted_fault_code": np.repeat(predicted, top.shape[1]),
+                    "rank": np.tile(np.arange(1, top.shape[1] + 1), len(X)),
+                    "feature": np.asarray(feature_names)[top].ravel(),
+                    "feature_value": X[rows[:, None], top].ravel(),
+                    "shap_value": for_predicted[rows[:, None], top].ravel(),
+                }
+            )
+
+    columns = ["unit_id", "timestamp", "fault_code", *feature_names]
+    return sample_df.select(*columns).mapInPandas(explain_partition, EXPLANATION_SCHEMA)
+
+
+def explain_to_table(features_df, forest, table, label="fault_code", max_rows=10_000, top_k=3, seed=42):
+    sample = stratified_sample(features_df.filter(F.col(label).isNotNull()), label, max_rows, seed)
+    explanations = explain(sample, forest, top_k).withColumn("explained_at", F.current_timestamp())
+    explanations.write.mode("overwrite").saveAsTable(table)
+    return explanations
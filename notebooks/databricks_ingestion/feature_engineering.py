@@ -0,0 +1,113 @@
+"""
+feature_engineering.py
+
+Rolling per-unit telemetry features for the fault model, maintained as an
+incrementally updated feature table.
+
+Every window expression shares one partitionBy(unit_id)/orderBy(ts) spec,
+so Spark computes all of them in a single sort + Window operator; only the
+frames differ.
+"""
+
+from datetime import timedelta
+
+from pyspark.sql import Window
+from pyspark.sql import functions as F
+
+SENSORS = ["temperature", "vibration", "power_draw"]
+WINDOWS_MINUTES = [5, 15, 60]
+LOOKBACK_SECONDS = max(WINDOWS_MINUTES) * 60
+
+FEATURE_COLUMNS = (
+    SENSORS
+    + [
+        f"{sensor}_{agg}_{minutes}m"
+        for minutes in WINDOWS_MINUTES
+        for sensor in SENSORS
+        for agg in ("mean", "std", "max")
+    ]
+    + [f"{sensor}_delta" for sensor in SENSORS]
+    + ["minutes_since_maintenance"]
+)
+
+
+def telemetry_features(telemetry_df, maintenance_df, carry=()):
+    # carry: extra telemetry columns passed through to the output unchanged
+    readings = telemetry_df.select(
+        "unit_id", "timestamp", *SENSORS, "fault_code", *carry, F.lit(False).alias("_maintenance")
+    )
+    # Maintenance events ride along as sensor-less rows in the same ordering, so "last maintenance"
+    # is just another expression over the shared window spec
+    events = maintenance_df.select(
+        "unit_id",
+        "timestamp",
+        *[F.lit(None).cast("double").alias(sensor) for sensor in SENSORS],
+        F.lit(None).cast("long").alias("fault_code"),
+        *[F.lit(None).alias(column) for column in carry],
+        F.lit(True).alias("_maintenance"),
+    )
+    df = readings.unionByName(events).withColumn("_ts", F.col("timestamp").cast("long"))
+
+    by_unit = Window.partitionBy("unit_id").orderBy("_ts")
+    history = by_unit.rangeBetween(Window.unboundedPreceding, 0)  # range frame: same-second maintenance counts
+    previous = by_unit.rowsBetween(Window.unboundedPreceding, -1)
+
+    projection = [F.col(c) for c in ["unit_id", "timestamp", *SENSORS, "fault_code", *carry, "_maintenance"]]
+    for minutes in WINDOWS_MINUTES:
+        frame = by_unit.rangeBetween(-(minutes * 60 - 1), 0)
+        for sensor in SENSORS:
+            projection += [
+                F.avg(sensor).over(frame).alias(f"{sensor}_mean_{minutes}m"),
+                F.stddev(sensor).over(frame).alias(f"{sensor}_std_{minutes}m"),
+                F.max(sensor).over(frame).alias(f"{sensor}_max_{minutes}m"),
+            ]
+    for sensor in SENSORS:
+        # Previous non-null reading, skipping interleaved maintenance rows
+        projection.append((F.col(sensor) - F.last(sensor, ignorenulls=True).over(previous)).alias(f"{sensor}_delta"))
+    last_maintenance = F.last(F.when(F.col("_maintenance"), F.col("_ts")), ignorenulls=True).over(history)
+    projection.append(((F.col("_ts") - last_maintenance) / 60).alias("minutes_since_maintenance"))
+
+    std_and_delta = [c for c in FEATURE_COLUMNS if "_std_" in c or c.endswith("_delta")]
+    return (
+        df.select(*projection)
+        .filter(~F.col("_maintenance"))
+        .drop("_maintenance")
+        .withColumn("date", F.to_date("timestamp"))
+        # Single-reading windows have no std/delta; units never serviced get -1
+        .fillna(0.0, subset=std_and_delta)
+        .fillna(-1.0, subset=["minutes_since_maintenance"])
+    )
+
+
+def features_for_readings(spark, readings_df, telemetry_table="telemetry_gold", maintenance_table="maintenance_gold"):
+    # Features for exactly the readings in readings_df (e.g. the gold rows of newly ingested files), whatever
+    # their event time. Their windows need each unit's previous hour, re-read from the telemetry table.
+    bounds = readings_df.agg(F.min("timestamp"), F.max("timestamp")).first()
+    if bounds[0] is None:
+        return None
+    context_start = bounds[0] - timedelta(seconds=LOOKBACK_SECONDS)
+    columns = ["unit_id", "timestamp", *SENSORS, "fault_code"]
+    # The date predicate is what prunes partitions; the timestamp one alone would scan every date.
+    # Table copies of the readings are swapped for the flagged ones, so each reading is featurized once.
+    context = (
+        spark.read.table(telemetry_table)
+        .filter(F.col("date").between(context_start.date(), bounds[1].date()))
+        .filter(F.col("timestamp").between(context_start, bounds[1]))
+        .join(readings_df.select("unit_id", "timestamp"), ["unit_id", "timestamp"], "left_anti")
+        .select(*columns, F.lit(False).alias("_new"))
+        .unionByName(readings_df.select(*columns, F.lit(True).alias("_new")))
+    )
+    features = telemetry_features(context, spark.read.table(maintenance_table), carry=["_new"])
+    return features.filter(F.col("_new")).drop("_new")
+
+
+def rebuild_feature_table(
+    spark, feature_table="telemetry_features", telemetry_table="telemetry_gold", maintenance_table="maintenance_gold"
+):
+    features = telemetry_features(spark.read.table(telemetry_table), spark.read.table(maintenance_table))
+    write_features(features, feature_table, mode="overwrite")
+    return features
+
+
+def write_features(features_df, feature_table, mode="append"):
+    features_df.write.mode(mode).partitionBy("date").saveAsTable(feature_table)
@@ -9,13 +9,37 @@ Secrets are managed securely using environment variables.
 Author: Adriel
 """
 
+import json
+import logging
 import os
-from pyspark.sql.functions import col, lit, coalesce, date_format
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pyspark.sql import Observation
+from pyspark.sql import functions as F
+from pyspark.sql.functions import col
+from pyspark.sql.streaming import StreamingQueryListener
 from pyspark.ml.feature import VectorAssembler
 from pyspark.ml.classification import RandomForestClassifier
 from pyspark.ml.evaluation import MulticlassClassificationEvaluator
 import mlflow
 import mlflow.spark
+from layer_transforms import CLUSTER_COLUMNS, to_gold, to_silver, write_silver_and_gold
+from compaction import compact_table, table_provider
+from feature_engineering import FEATURE_COLUMNS, features_for_readings, rebuild_feature_table, write_features
+from model_scoring import export_forest, load_model, score, score_stream, write_predictions
+from explainability import explain_to_table
+
+# Shared instrumentation lives under devops/ at the repo root; notebooks run from their own folder
+repo_root = os.path.abspath(os.path.join(os.getcwd(), "..", ".."))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+from devops.terraform.utils.instrumentation import configure_logging, metrics  # noqa: E402
+from data_simulator.schemas import spark_ddl  # noqa: E402
+
+configure_logging()
+logger = logging.getLogger("full_pipeline_with_ml")
 
 # ✅ Step 1: Define secure variables
 storage_account_name = os.getenv("AZURE_STORAGE_ACCOUNT")  # e.g. "storagepredictivedata"
@@ -23,72 +47,329 @@ container_name = os.getenv("AZURE_CONTAINER_NAME", "telemetry-data")
 access_key = os.getenv("AZURE_ACCESS_KEY")
 
 # ✅ Step 2: Set Spark config for ABFSS (Azure Blob Filesystem - Secure)
-spark.conf.set(
-    f"fs.azure.account.key.{storage_account_name}.dfs.core.windows.net",
-    access_key
-)
+spark.conf.set(f"fs.azure.account.key.{storage_account_name}.dfs.core.windows.net", access_key)
 
 # ✅ Step 3: Define domains
 domains = ["telemetry", "weather", "vehicle_usage", "maintenance", "energy_costs"]
 
-# ✅ Step 4: Bronze Ingestion - Streaming JSON to Bronze Tables
-for domain in domains:
-    path = f"abfss://{container_name}@{storage_account_name}.dfs.core.windows.net/bronze/{domain}/landing/2025/06/02/{domain}/"
-    try:
-        df = (
-            spark.read
-            .format("json")
-            .option("recursiveFileLookup", "true")
-            .option("multiline", "true")
-            .load(path)
+# Landing format written by the simulators (--format): json, ndjson, ndjson.gz or parquet.
+# Only legacy "json" arrays need multiline parsing, which stops Spark from splitting files.
+landing_format = os.getenv("LANDING_FORMAT", "ndjson")
+
+
+# Bronze mode: "incremental" only ingests files not seen before (tracked in a checkpoint) and appends;
+# "full" re-reads the whole landing path and overwrites, as the pipeline originally did.
+bronze_mode = os.getenv("BRONZE_MODE", "incremental")
+lake_root = f"abfss://{container_name}@{storage_account_name}.dfs.core.windows.net"
+checkpoint_root = os.getenv("CHECKPOINT_ROOT", f"{lake_root}/_checkpoints")
+
+# Set LANDING_ROOT to the simulators' local landing folder to run the same ingestion on local Spark
+local_landing_root = os.getenv("LANDING_ROOT")
+on_databricks = "DATABRICKS_RUNTIME_VERSION" in os.environ
+
+
+def landing_path(domain):
+    if local_landing_root:
+        return f"{local_landing_root}/*/*/*/{domain}/"
+    return f"{lake_root}/bronze/{domain}/"
+
+
+def source_format():
+    return "parquet" if landing_format == "parquet" else "json"
+
+
+# Keeps other formats' files (and anything else) sharing the folder out of the read
+landing_glob = {"json": "*.json", "ndjson": "*.json", "ndjson.gz": "*.json.gz", "parquet": "*.parquet"}[landing_format]
+
+
+def landing_schema(domain):
+    # Fixed landing schema from data_simulator/schemas.py: nothing is inferred, so no scan over the landing
+    # files, and JSON numbers stay numeric (Auto Loader would otherwise infer every JSON column as a string)
+    return spark_ddl(domain, source_format())
+
+
+def landing_reader(domain):
+    reader = (
+        spark.read.schema(landing_schema(domain))
+        .option("recursiveFileLookup", "true")
+        .option("pathGlobFilter", landing_glob)
+    )
+    if landing_format == "parquet":
+        return reader.format("parquet")
+    return reader.format("json").option("multiline", str(landing_format == "json").lower())
+
+
+def landing_stream(domain):
+    path = landing_path(domain)
+    if on_databricks:
+        # Auto Loader keeps the set of ingested files in the checkpoint
+        reader = spark.readStream.format("cloudFiles").option("cloudFiles.format", source_format())
+    else:
+        # Plain file source: same exactly-once file tracking via the checkpoint
+        reader = spark.readStream.format(source_format())
+    reader = reader.schema(landing_schema(domain))
+    if source_format() == "json":
+        reader = reader.option("multiline", str(landing_format == "json").lower())
+    return reader.option("recursiveFileLookup", "true").option("pathGlobFilter", landing_glob).load(path)
+
+
+class StreamRowCounter(StreamingQueryListener):
+    # Sums numInputRows over every micro-batch of a run; query.recentProgress only keeps the last ~100
+    # progress updates, so a large availableNow backlog would be under-counted
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rows = {}
+        self.finished = {}
+
+    def _finished(self, run_id):
+        with self.lock:
+            return self.finished.setdefault(run_id, threading.Event())
+
+    def onQueryStarted(self, event):
+        pass
+
+    def onQueryProgress(self, event):
+        run_id = str(event.progress.runId)
+        with self.lock:
+            self.rows[run_id] = self.rows.get(run_id, 0) + event.progress.numInputRows
+
+    def onQueryIdle(self, event):
+        pass
+
+    def onQueryTerminated(self, event):
+        self._finished(str(event.runId)).set()
+
+    def total(self, query, timeout=60):
+        # Listener events arrive asynchronously, in order: once the run's terminated event is in, so are
+        # all of its progress updates
+        run_id = str(query.runId)
+        self._finished(run_id).wait(timeout)
+        with self.lock:
+            self.finished.pop(run_id, None)
+            return self.rows.pop(run_id, 0)
+
+
+stream_rows = StreamRowCounter()
+spark.streams.addListener(stream_rows)
+
+
+def ingest_bronze_incremental(domain):
+    # availableNow processes every unseen file in bounded micro-batches, then stops
+    query = (
+        landing_stream(domain)
+        .writeStream.outputMode("append")
+        .option("checkpointLocation", f"{checkpoint_root}/{domain}_bronze")
+        .trigger(availableNow=True)
+        .toTable(f"{domain}_bronze")
+    )
+    query.awaitTermination()
+    # Row counts come from the micro-batch progress metrics, not from a second pass over the data
+    return stream_rows.total(query)
+
+
+def ingest_bronze_full(domain):
+    # Rows are counted by an observed metric during the write itself: no separate count() action, and
+    # unlike Delta's DESCRIBE HISTORY it works for every table format (Parquet on local Spark)
+    written = Observation(f"{domain}_bronze")
+    (
+        landing_reader(domain)
+        .load(landing_path(domain))
+        .observe(written, F.count(F.lit(1)).alias("rows"))
+        .write.mode("overwrite")
+        .saveAsTable(f"{domain}_bronze")
+    )
+    return written.get["rows"]
+
+
+# Silver is cached and projected straight into Gold instead of being read back from the metastore
+cache_layers = os.getenv("CACHE_LAYERS", "true").lower() == "true"
+
+# Silver/Gold are date-partitioned, and telemetry is clustered by unit_id inside each partition. Delta has no
+# bucketBy, so on Databricks the clustering comes from OPTIMIZE ... ZORDER BY in the compaction step instead.
+layer_buckets = None if on_databricks else int(os.getenv("LAYER_BUCKETS", "8"))
+
+# Compaction merges the small files each run appends into right-sized ones, in the date partitions it wrote
+compact_layers = os.getenv("COMPACT_LAYERS", "true").lower() == "true"
+
+# Domains run concurrently; each submits its Spark jobs to its own FAIR scheduler pool so small
+# domains aren't queued behind telemetry. Needs spark.scheduler.mode=FAIR (the Databricks default).
+pipeline_parallelism = int(os.getenv("PIPELINE_PARALLELISM", len(domains)))
+
+
+def checkpoint_query_id(checkpoint):
+    # Spark writes {"id": <query id>} to <checkpoint>/metadata when the checkpoint is created, before any
+    # batch runs: the id survives restarts from that checkpoint and is new for every fresh one
+    return json.loads(spark.read.text(f"{checkpoint}/metadata").first()[0])["id"]
+
+
+def update_silver_and_gold(domain, timings, dates):
+    # Silver and Gold are row-by-row maps of Bronze, so only bronze rows added since the last run are
+    # transformed and appended; the stream's checkpoint remembers which bronze data was processed
+    checkpoint = f"{checkpoint_root}/{domain}_silver_gold"
+    txn_app_ids = {}
+
+    def process_batch(batch_df, batch_id):
+        # A new checkpoint starts at batch 0 with all of bronze, which rebuilds the tables rather than
+        # appending a second copy. txnAppId/txnVersion turn a retried batch into a no-op on Delta; the
+        # app id is per checkpoint, so a reset checkpoint's batch ids don't collide with the old ones
+        if "id" not in txn_app_ids:
+            txn_app_ids["id"] = f"{domain}_layers_{checkpoint_query_id(checkpoint)}"
+        write_silver_and_gold(
+            batch_df,
+            f"{domain}_silver",
+            f"{domain}_gold",
+            cache=cache_layers,
+            timings=timings,
+            mode="overwrite" if batch_id == 0 else "append",
+            cluster_by=CLUSTER_COLUMNS.get(domain),
+            buckets=layer_buckets,
+            options={"txnAppId": txn_app_ids["id"], "txnVersion": str(batch_id)},
+            dates=dates,
         )
-        print(f"✅ Loaded {df.count()} rows into: {domain}_bronze")
-        df.write.mode("overwrite").saveAsTable(f"{domain}_bronze")
-    except Exception as e:
-        print(f"❌ Failed to load {domain}: {e}")
 
-# ✅ Step 5: Silver Transformation - Drop nulls
-for domain in domains:
-    try:
-        bronze_df = spark.read.table(f"{domain}_bronze")
-        silver_df = bronze_df.dropna(how="all")
-        silver_df.write.mode("overwrite").saveAsTable(f"{domain}_silver")
-        print(f"✅ Processed Silver table: {domain}_silver")
-    except Exception as e:
-        print(f"❌ Error in Silver layer for {domain}: {e}")
+    query = (
+        spark.readStream.table(f"{domain}_bronze")
+        .writeStream.foreachBatch(process_batch)
+        .option("checkpointLocation", checkpoint)
+        .trigger(availableNow=True)
+        .start()
+    )
+    query.awaitTermination()
+    # The batches were written through the stream's own session; drop this session's cached file
+    # listings so later reads see them (Delta re-reads its log anyway, Parquet tables need this)
+    spark.catalog.refreshTable(f"{domain}_silver")
+    spark.catalog.refreshTable(f"{domain}_gold")
 
-# ✅ Step 6: Gold Transformation - Enrich and clean for ML
-for domain in domains:
+
+def run_domain_pipeline(domain):
+    # Bronze -> Silver -> Gold end-to-end for one domain, with per-stage wall-clock timings
+    spark.sparkContext.setLocalProperty("spark.scheduler.pool", domain)
+    timings = {}
+    dates = set()  # date partitions written, compacted in step 6a
     try:
-        silver_df = spark.read.table(f"{domain}_silver")
-        if "timestamp" in silver_df.columns:
-            silver_df = (
-                silver_df
-                .withColumn("date", date_format("timestamp", "dd/MM/yyyy"))
-                .withColumn("time", date_format("timestamp", "HH:mm:ss"))
-                .drop("timestamp")
-            )
-        for col_name in silver_df.columns:
-            silver_df = silver_df.withColumn(
-                col_name, coalesce(col(col_name).cast("string"), lit("unknown"))
+        start = time.perf_counter()
+        if bronze_mode == "full":
+            rows = ingest_bronze_full(domain)
+        else:
+            rows = ingest_bronze_incremental(domain)
+        timings["bronze"] = time.perf_counter() - start
+        logger.info("✅ Loaded %d new rows into: %s_bronze (%s)", rows, domain, bronze_mode)
+
+        if bronze_mode == "full":
+            write_silver_and_gold(
+                spark.read.table(f"{domain}_bronze"),
+                f"{domain}_silver",
+                f"{domain}_gold",
+                cache=cache_layers,
+                timings=timings,
+                cluster_by=CLUSTER_COLUMNS.get(domain),
+                buckets=layer_buckets,
+                dates=dates,
             )
-        cols = silver_df.columns
-        if "date" in cols and "time" in cols:
-            cols.remove("date")
-            cols.remove("time")
-            silver_df = silver_df.select(["date", "time"] + cols)
-        silver_df.write.mode("overwrite").saveAsTable(f"{domain}_gold")
-        print(f"✅ Saved Gold table: {domain}_gold")
+        else:
+            update_silver_and_gold(domain, timings, dates)
+        logger.info("✅ Processed Silver table: %s_silver", domain)
+        logger.info("✅ Saved Gold table: %s_gold", domain)
+        metrics.count("rows", rows, domain=domain, layer="bronze")
+        return {"domain": domain, "ok": True, "rows": rows, "dates": dates, **timings}
     except Exception as e:
-        print(f"❌ Error in Gold layer for {domain}: {e}")
+        logger.error("❌ Pipeline failed for %s: %s", domain, e)
+        return {"domain": domain, "ok": False, "rows": 0, "error": str(e), "dates": dates, **timings}
+    finally:
+        for stage, seconds in timings.items():
+            metrics.observe("spark_layer", seconds, domain=domain, layer=stage)
+        spark.sparkContext.setLocalProperty("spark.scheduler.pool", None)
+
+
+def run_all_domains(domains, parallelism=pipeline_parallelism):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, parallelism)) as pool:
+        results = list(pool.map(run_domain_pipeline, domains))
+    wall = time.perf_counter() - start
+
+    lines = []
+    for result in results:
+        stages = "  ".join(f"{stage}={result[stage]:.1f}" for stage in ("bronze", "silver", "gold") if stage in result)
+        lines.append(f"   {'✅' if result['ok'] else '❌'} {result['domain']:<14} {stages}")
+    logger.info("⏱️ Per-domain stage timings (s):\n%s", "\n".join(lines))
+    serial = sum(result.get(stage, 0.0) for result in results for stage in ("bronze", "silver", "gold"))
+    logger.info("📈 Wall clock %.1fs vs %.1fs of summed stage time", wall, serial)
+    return results
+
+
+# ✅ Step 4-6: Bronze (incremental ingestion), Silver (drop empty rows), Gold (typed), both partitioned by date
+domain_results = run_all_domains(domains)
+
+# ✅ Step 6a: Compaction - merge the small files this run appended into right-sized files
+# Only the date partitions the run wrote are touched (backfills reach days back, so not just the latest ones).
+# Bronze is only compacted on Delta: a local bronze table is a file-stream sink whose log lists its files
+if compact_layers:
+    compaction_lines = []
+    for result in domain_results:
+        domain = result["domain"]
+        tables = [f"{domain}_silver", f"{domain}_gold"]
+        if table_provider(spark, f"{domain}_bronze") == "delta":
+            tables.insert(0, f"{domain}_bronze")
+        for table in tables:
+            try:
+                with metrics.span("compaction", table=table):
+                    compacted = compact_table(spark, table, result["dates"], CLUSTER_COLUMNS.get(domain), layer_buckets)
+                compaction_lines.append(
+                    f"   {table:<24} {compacted['files_before']:>6} -> {compacted['files_after']} files"
+                    f" ({len(result['dates'])} dates)"
+                )
+            except Exception as e:
+                logger.error("❌ Compaction failed for %s: %s", table, e)
+    logger.info("🗜️ Compacted the partitions this run wrote:\n%s", "\n".join(compaction_lines))
+
+
+def update_features(checkpoint):
+    # Progress is tracked by what was ingested, not by event time: a stream over telemetry_bronze remembers
+    # which readings were featurized, so backfilled readings older than the table's newest still get features.
+    # Bronze rather than gold, since local compaction rewrites gold's files and a stream would re-read them.
+    # A new checkpoint starts at batch 0 with all of bronze, which rebuilds the table.
+    def featurize_batch(batch_df, batch_id):
+        # Cached so the batch is read once, not once per action (and counted once by stream_rows)
+        readings = to_gold(to_silver(batch_df)).cache()
+        try:
+            features = features_for_readings(batch_df.sparkSession, readings, "telemetry_gold", "maintenance_gold")
+            if features is not None:
+                write_features(features, "telemetry_features", mode="overwrite" if batch_id == 0 else "append")
+        finally:
+            readings.unpersist()
+
+    query = (
+        spark.readStream.table("telemetry_bronze")
+        .writeStream.foreachBatch(featurize_batch)
+        .option("checkpointLocation", checkpoint)
+        .trigger(availableNow=True)
+        .start()
+    )
+    query.awaitTermination()
+    spark.catalog.refreshTable("telemetry_features")
+    return stream_rows.total(query)
+
+
+# ✅ Step 6b: Feature engineering - rolling 5/15/60 min per-unit aggregates, deltas, time since maintenance
+# Incremental: the readings ingested since the last run are featurized, with a 60 min lookback for context
+try:
+    with metrics.span("features"):
+        if bronze_mode == "full":
+            rebuild_feature_table(spark, "telemetry_features", "telemetry_gold", "maintenance_gold")
+            logger.info("✅ Rebuilt feature table: telemetry_features")
+        else:
+            featurized = update_features(f"{checkpoint_root}/telemetry_features")
+            logger.info("✅ Featurized %d new readings into: telemetry_features", featurized)
+except Exception as e:
+    logger.error("❌ Feature engineering failed: %s", e)
 
 # ✅ Step 7: ML Pipeline - Train RandomForestClassifier (example: telemetry)
 try:
-    df = spark.read.table("telemetry_gold")
+    df = spark.read.table("telemetry_features")
     df = df.filter(col("fault_code").isNotNull())
 
     # Select features and label
-    features = ["engine_temp", "speed", "load"]
+    features = FEATURE_COLUMNS
     label = "fault_code"
 
     df = df.select(*features, label).dropna()
@@ -102,7 +383,8 @@ try:
 
     # Train model
     rf = RandomForestClassifier(featuresCol="features", labelCol=label, numTrees=10)
-    model = rf.fit(train_df)
+    with metrics.span("train"):
+        model = rf.fit(train_df)
 
     # Predict
     predictions = model.transform(test_df)
@@ -110,7 +392,7 @@ try:
     # Evaluate
     evaluator = MulticlassClassificationEvaluator(labelCol=label, predictionCol="prediction", metricName="accuracy")
     accuracy = evaluator.evaluate(predictions)
-    print(f"🎯 Accuracy: {accuracy:.2f}")
+    logger.info("🎯 Accuracy: %.2f", accuracy)
 
     # ✅ Log model with MLflow
     mlflow.set_experiment("/Users/adriel.mlflow/telemetry_rf")
@@ -119,31 +401,70 @@ try:
         mlflow.log_param("label", label)
         mlflow.log_metric("accuracy", accuracy)
         mlflow.spark.log_model(model, "telemetry_rf_model")
-        print("✅ Model logged with MLflow")
+        # Plain-array copy of the trees for local_scorer.py (scoring without Spark)
+        mlflow.log_dict(export_forest(model, features), "telemetry_rf_trees.json")
+        logger.info("✅ Model logged with MLflow")
 
 except Exception as e:
-    print(f"❌ ML pipeline failed: {e}")
+    logger.error("❌ ML pipeline failed: %s", e)
 
 
-# ✅ Step 8: SHAP Explainability (Optional but Recommended)
+# ✅ Step 7b: Scoring - new feature rows scored in micro-batches into telemetry_predictions
+# SCORING_MODEL_URI (e.g. models:/telemetry_rf/Production) scores with a registered model instead of this run's
 try:
-    import shap
-    import pandas as pd
-
-    # Convert a sample of test data to Pandas
-    pandas_df = test_df.select("features").toPandas()
-
-    # Extract raw feature importances from the trained model
-    feature_importances = model.featureImportances.toArray()
+    scoring_model_uri = os.getenv("SCORING_MODEL_URI")
+    scoring_model = load_model(scoring_model_uri) if scoring_model_uri else model
+    if bronze_mode == "full":
+        # The feature table was rebuilt, so the predictions are too; a stream would score every row again
+        written = Observation("telemetry_predictions")
+        with metrics.span("score"):
+            predictions = score(scoring_model, spark.read.table("telemetry_features"), FEATURE_COLUMNS)
+            predictions = predictions.observe(written, F.count(F.lit(1)).alias("rows"))
+            write_predictions(predictions, "telemetry_predictions", mode="overwrite")
+        scored = written.get["rows"]
+    else:
+        query = score_stream(
+            spark.readStream.table("telemetry_features"),
+            scoring_model,
+            FEATURE_COLUMNS,
+            "telemetry_predictions",
+            f"{checkpoint_root}/telemetry_predictions",
+        )
+        with metrics.span("score"):
+            query.awaitTermination()
+        scored = stream_rows.total(query)
+    metrics.count("rows", scored, domain="telemetry", layer="predictions")
+    logger.info("✅ Scored %d new rows into: telemetry_predictions", scored)
+except Exception as e:
+    logger.error("❌ Scoring failed: %s", e)
 
-    # Create SHAP explainer using feature importances as a proxy
-    explainer = shap.Explainer(lambda x: feature_importances, pandas_df)
-    shap_values = explainer(pandas_df)
 
-    # Plot summary
-    shap.summary_plot(shap_values, pandas_df)
+# ✅ Step 8: SHAP Explainability - tree SHAP on a stratified sample, computed on the executors
+# Driver memory stays bounded: only class counts and the exported trees live there, never the sample
+explain_max_rows = int(os.getenv("EXPLAIN_MAX_ROWS", 10000))
+try:
+    with metrics.span("explain"):
+        explanations = explain_to_table(
+            spark.read.table("telemetry_features"),
+            export_forest(model, FEATURE_COLUMNS),
+            "telemetry_explanations",
+            max_rows=explain_max_rows,
+            top_k=3,
+        )
+    logger.info("✅ Saved SHAP attributions: telemetry_explanations")
 
-    print("✅ SHAP summary plot generated.")
+    # Which features most often drive predictions, aggregated in Spark
+    (
+        spark.read.table("telemetry_explanations")
+        .groupBy("predicted_fault_code", "feature")
+        .agg(F.count("*").alias("times_in_top_3"), F.avg(F.abs("shap_value")).alias("mean_abs_shap"))
+        .orderBy("predicted_fault_code", F.desc("times_in_top_3"))
+        .show(15, truncate=False)
+    )
 
 except Exception as e:
-    print(f"❌ SHAP failed: {e}")
+    logger.error("❌ SHAP failed: %s", e)
+
+# ✅ Run summary: where the time went; RAILSIGHT_METRICS_PATH also exports it (JSON lines, or .prom)
+logger.info("⏱️ Pipeline timings:\n%s", metrics.summary())
+metrics.export()
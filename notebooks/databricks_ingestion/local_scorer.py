@@ -0,0 +1,135 @@
+"""
+local_scorer.py
+
+Scores telemetry with the fault model without Spark. The random forest is
+exported once from the trained Spark model (model_scoring.export_forest)
+and evaluated here with NumPy, all trees at once. telemetry_features()
+reproduces feature_engineering.py in pandas, so simulator output can be
+scored directly:
+
+    forest = load_forest("telemetry_rf_trees.json")
+    scored = score_frame(forest, telemetry_features(telemetry, maintenance))
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+# Mirrors feature_engineering.py; the exported forest carries its own feature names
+SENSORS = ["temperature", "vibration", "power_draw"]
+WINDOWS_MINUTES = [5, 15, 60]
+
+
+def load_forest(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_forest(forest, path):
+    with open(path, "w") as f:
+        json.dump(forest, f)
+
+
+class ForestArrays:
+    # All trees concatenated into flat node arrays; child indices are made global via per-tree offsets
+    def __init__(self, forest):
+        self.feature_names = forest["feature_names"]
+        trees = forest["trees"]
+        sizes = [len(tree["features"]) for tree in trees]
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+        def stacked(key, offset_children=False):
+            parts = []
+            for tree, offset in zip(trees, offsets):
+                part = np.asarray(tree[key])
+                if offset_children:
+                    part = np.where(part >= 0, part + offset, -1)
+                parts.append(part)
+            return np.concatenate(parts)
+
+        self.left = stacked("children_left", offset_children=True)
+        self.right = stacked("children_right", offset_children=True)
+        self.features = np.maximum(stacked("features"), 0)  # leaves never read their feature
+        self.thresholds = stacked("thresholds").astype(np.float64)
+        self.values = np.concatenate([np.asarray(tree["values"], dtype=np.float64) for tree in trees])
+        self.roots = offsets
+        self.max_depth = max(_depth(tree) for tree in trees)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            left = self.left[node]
+            internal = left >= 0
+            if not internal.any():
+                break
+            go_left = X[rows, self.features[node]] <= self.thresholds[node]
+            node = np.where(internal, np.where(go_left, left, self.right[node]), node)
+        # Same as Spark's RandomForestClassificationModel: average the trees' leaf class probabilities
+        proba = self.values[node].sum(axis=1)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+
+def _depth(tree):
+    depth, frontier = 0, [0]
+    while frontier:
+        frontier = [
+            child
+            for node in frontier
+            for child in (tree["children_left"][node], tree["children_right"][node])
+            if child >= 0
+        ]
+        depth += 1
+    return depth
+
+
+def score_frame(forest, features):
+    arrays = forest if isinstance(forest, ForestArrays) else ForestArrays(forest)
+    proba = arrays.predict_proba(features[arrays.feature_names].to_numpy())
+    return pd.DataFrame(
+        {
+            "unit_id": features["unit_id"].to_numpy(),
+            "timestamp": features["timestamp"].to_numpy(),
+            "predicted_fault_code": proba.argmax(axis=1),
+            "fault_probability": 1 - proba[:, 0],
+        }
+    )
+
+
+def telemetry_features(telemetry, maintenance=None):
+    df = telemetry.sort_values(["unit_id", "timestamp"], ignore_index=True)
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    groups = df.groupby("unit_id", observed=True, sort=False)
+
+    columns = {}
+    for minutes in WINDOWS_MINUTES:
+        # (t - window, t] per unit like the Spark range frame; df is sorted by unit then time,
+        # so the grouped result lines up with it row for row
+        rolled = groups.rolling(f"{minutes}min", on="timestamp")[SENSORS]
+        for agg in ("mean", "std", "max"):
+            values = getattr(rolled, agg)()
+            for sensor in SENSORS:
+                columns[f"{sensor}_{agg}_{minutes}m"] = values[sensor].to_numpy()
+    for sensor in SENSORS:
+        columns[f"{sensor}_delta"] = groups[sensor].diff().to_numpy()
+    features = pd.concat([df, pd.DataFrame(columns, index=df.index)], axis=1)
+    features = features.fillna({name: 0.0 for name in columns if "_std_" in name or name.endswith("_delta")})
+
+    features["minutes_since_maintenance"] = -1.0
+    if maintenance is not None and len(maintenance):
+        events = maintenance[["unit_id", "timestamp"]].astype({"unit_id": str})
+        events["timestamp"] = pd.to_datetime(events["timestamp"]).astype(features["timestamp"].dtype)
+        events = events.rename(columns={"timestamp": "last_maintenance"}).sort_values("last_maintenance")
+        keyed = features[["unit_id", "timestamp"]].astype({"unit_id": str}).reset_index()
+        merged = (
+            pd.merge_asof(
+                keyed.sort_values("timestamp"), events, left_on="timestamp", right_on="last_maintenance", by="unit_id"
+            )
+            .set_index("index")
+            .sort_index()
+        )
+        since = (merged["timestamp"] - merged["last_maintenance"]).dt.total_seconds() / 60
+        features["minutes_since_maintenance"] = since.fillna(-1.0).to_numpy()
+    return features
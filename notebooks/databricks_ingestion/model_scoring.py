@@ -0,0 +1,125 @@
+"""
+model_scoring.py
+
+Scoring for the telemetry fault model: incremental batch and streaming
+(foreachBatch) scoring of the feature table into a predictions table, and
+export of the trained random forest to plain arrays for local_scorer.py.
+"""
+
+from functools import lru_cache
+
+from pyspark.ml.feature import VectorAssembler
+from pyspark.ml.functions import vector_to_array
+from pyspark.sql import functions as F
+
+KEY_COLUMNS = ["unit_id", "timestamp", "date"]
+
+
+@lru_cache(maxsize=None)
+def load_model(model_uri):
+    # Loaded once per driver; every micro-batch reuses the same model object
+    import mlflow.spark
+
+    return mlflow.spark.load_model(model_uri)
+
+
+def score(model, features_df, feature_columns):
+    assembler = VectorAssembler(inputCols=list(feature_columns), outputCol=model.getFeaturesCol())
+    return model.transform(assembler.transform(features_df)).select(
+        *KEY_COLUMNS,
+        F.col(model.getPredictionCol()).cast("int").alias("predicted_fault_code"),
+        (1 - vector_to_array(model.getProbabilityCol())[0]).alias("fault_probability"),
+        F.current_timestamp().alias("scored_at"),
+    )
+
+
+def write_predictions(predictions_df, predictions_table, mode="append"):
+    predictions_df.write.mode(mode).partitionBy("date").saveAsTable(predictions_table)
+
+
+def score_new_features(
+    spark, model, feature_columns, feature_table="telemetry_features", predictions_table="telemetry_predictions"
+):
+    # Batch path: score only feature rows newer than the predictions table's high-water mark
+    features = spark.read.table(feature_table)
+    if spark.catalog.tableExists(predictions_table):
+        watermark = spark.read.table(predictions_table).agg(F.max("timestamp")).first()[0]
+        if watermark is not None:
+            # date prunes the feature table's partitions, timestamp trims within the first one
+            features = features.filter(
+                (F.col("date") >= F.to_date(F.lit(watermark))) & (F.col("timestamp") > F.lit(watermark))
+            )
+    predictions = score(model, features, feature_columns)
+    write_predictions(predictions, predictions_table)
+    return predictions
+
+
+def score_stream(
+    features_stream,
+    model,
+    feature_columns,
+    predictions_table,
+    checkpoint,
+    available_now=True,
+    processing_time="1 minute",
+):
+    # Streaming path: each micro-batch of new feature rows is scored with the already-loaded model
+    def score_batch(batch_df, batch_id):
+        write_predictions(score(model, batch_df, feature_columns), predictions_table)
+
+    writer = features_stream.writeStream.foreachBatch(score_batch).option("checkpointLocation", checkpoint)
+    if available_now:
+        writer = writer.trigger(availableNow=True)
+    else:
+        writer = writer.trigger(processingTime=processing_time)
+    return writer.start()
+
+
+def export_forest(model, feature_names):
+    # Random forest -> {"feature_names", "num_classes", "trees": [...]}, each tree in the array layout
+    # shap.TreeExplainer accepts as a dict model. Leaf and node values are class probabilities.
+    return {
+        "feature_names": list(feature_names),
+        "num_classes": model.numClasses,
+        "trees": [_export_tree(tree._java_obj.rootNode()) for tree in model.trees],
+    }
+
+
+def _export_tree(root):
+    tree = {
+        key: []
+        for key in (
+            "children_left",
+            "children_right",
+            "children_default",
+            "features",
+            "thresholds",
+            "values",
+            "node_sample_weight",
+        )
+    }
+
+    def add(node):
+        index = len(tree["features"])
+        stats = list(node.impurityStats().stats())
+        total = sum(stats)
+        tree["values"].append([s / total for s in stats] if total else stats)
+        tree["node_sample_weight"].append(total)
+        for key in ("children_left", "children_right", "children_default", "features"):
+            tree[key].append(-1)
+        tree["thresholds"].append(0.0)
+        if node.getClass().getSimpleName() == "LeafNode":
+            return index
+
+        split = node.split()
+        if split.getClass().getSimpleName() != "ContinuousSplit":
+            raise ValueError("Only continuous splits can be exported (features must not carry categorical metadata)")
+        tree["features"][index] = split.featureIndex()
+        tree["thresholds"][index] = split.threshold()  # Spark sends value <= threshold left
+        left = add(node.leftChild())
+        tree["children_left"][index] = tree["children_default"][index] = left
+        tree["children_right"][index] = add(node.rightChild())
+        return index
+
+    add(root)
+    return tree
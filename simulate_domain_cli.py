@@ -1,61 +1,211 @@
 import argparse
-
-from data_simulator.simulate_telemetry import generate_telemetry
-from data_simulator.simulate_maintenance_logs import generate_maintenance_logs
-from data_simulator.simulate_vehicle_usage import generate_vehicle_usage
-from data_simulator.simulate_weather import generate_weather
-from data_simulator.simulate_energy_costs import generate_energy_costs
-from devops.terraform.utils.blob_uploader import upload_to_blob
-from devops.terraform.utils.blob_initializer import initialize_blob_folders
+import importlib
+import logging
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
-# Map domain to function
+from data_simulator.writers import FORMATS, output_filename, write_chunks, write_domain_chunks
+from devops.terraform.utils.instrumentation import configure_logging, metrics
+
+# Generators, pandas/numpy and the blob client are imported on first use, so --help and
+# argument errors return without loading them (see benchmarks/bench_startup.py)
+
+logger = logging.getLogger(__name__)
+
+# Map domain to its generator module and (whole DataFrame, chunked iterator) functions;
+# the iterator is used when --chunk-size is set
 jobs = {
-    "telemetry": generate_telemetry,
-    "maintenance": generate_maintenance_logs,
-    "vehicle_usage": generate_vehicle_usage,
-    "weather": generate_weather,
-    "energy_costs": generate_energy_costs
+    "telemetry": ("data_simulator.simulate_telemetry", "generate_telemetry", "iter_telemetry"),
+    "maintenance": ("data_simulator.simulate_maintenance_logs", "generate_maintenance_logs", "iter_maintenance_logs"),
+    "vehicle_usage": ("data_simulator.simulate_vehicle_usage", "generate_vehicle_usage", "iter_vehicle_usage"),
+    "weather": ("data_simulator.simulate_weather", "generate_weather", "iter_weather"),
+    "energy_costs": ("data_simulator.simulate_energy_costs", "generate_energy_costs", "iter_energy_costs"),
 }
 
-def save_and_upload(domain, df, run_time, base_folder):
+
+def load_generator(domain, chunked=False):
+    module, generate_name, iter_name = jobs[domain]
+    return getattr(importlib.import_module(module), iter_name if chunked else generate_name)
+
+
+def generate(domain, chunk_size=None, seed=None):
+    # Whole DataFrame by default, or a lazy iterator of bounded chunks (timed chunk by chunk as it is consumed)
+    if chunk_size:
+        stream = load_generator(domain, chunked=True)
+        return metrics.timed_iter(stream(chunk_size=chunk_size, seed=seed), "generate", domain=domain)
+    generate_domain = load_generator(domain)
+    with metrics.span("generate", domain=domain):
+        return generate_domain(seed=seed)
+
+
+def save_and_upload(domain, data, run_time, base_folder, fmt="ndjson"):
+    # data is a DataFrame or an iterable of DataFrame chunks appended to the same file
+    import pandas as pd
+    from devops.terraform.utils.blob_uploader import upload_to_blob
+
     domain_folder = os.path.join(base_folder, domain)
     os.makedirs(domain_folder, exist_ok=True)
-    filename = f"{domain}_{run_time}.json"
+    filename = output_filename(domain, run_time, fmt)
     path = os.path.join(domain_folder, filename)
-    df.to_json(path, orient="records", lines=True)
-    print(f"✅ Saved to local: {path}")
+    chunks = [data] if isinstance(data, pd.DataFrame) else data
+    rows = write_chunks(chunks, path, fmt, domain)
+    logger.info("✅ Saved %d rows to local: %s", rows, path)
     upload_to_blob(path, layer="bronze", domain=domain)
-    print(f"☁️ Uploaded {domain} data to blob.")
+    logger.info("☁️ Uploaded %s data to blob.", domain)
+    return rows
+
+
+def save_and_upload_fleet(run_time, base_folder, chunk_size=None, seed=None, fmt="ndjson"):
+    # Every domain from one shared-clock simulation, one file per domain
+    def path_for(domain):
+        return os.path.join(base_folder, domain, output_filename(domain, f"fleet_{run_time}", fmt))
+
+    from data_simulator.simulate_fleet import FleetSimulation
+    from devops.terraform.utils.blob_uploader import upload_to_blob
+
+    simulation = FleetSimulation(seed=seed)
+    pairs = metrics.timed_iter(simulation.iter_domain_chunks(chunk_size), "generate", domain="fleet")
+    rows = write_domain_chunks(pairs, path_for, fmt)
+    for domain, count in rows.items():
+        logger.info("✅ Saved %d rows to local: %s", count, path_for(domain))
+        upload_to_blob(path_for(domain), layer="bronze", domain=domain)
+    logger.info("☁️ Uploaded fleet data to blob.")
+    return sum(rows.values())
+
+
+def init_worker(level):
+    # Forked workers start with a copy of the parent's metrics; clear it so nothing is reported twice.
+    # Logging is configured explicitly so the spawn start method logs at the parent's level too.
+    configure_logging(level)
+    metrics.reset()
+
+
+def run_job(domain, run_name, base_folder, chunk_size, seed, fmt="ndjson"):
+    # Top-level so it can be pickled into pool workers; returns per-job timing, plus the metrics
+    # recorded while it ran so a worker process can hand them back to the parent
+    start = time.perf_counter()
+    logger.info("🚀 Generating data for: %s (%s)", domain, run_name)
+    if domain == "fleet":
+        rows = save_and_upload_fleet(run_name, base_folder, chunk_size, seed, fmt)
+    else:
+        rows = save_and_upload(domain, generate(domain, chunk_size, seed), run_name, base_folder, fmt)
+    return {
+        "domain": domain,
+        "run": run_name,
+        "rows": rows,
+        "seconds": time.perf_counter() - start,
+        "metrics": metrics.drain(),
+    }
+
+
+def plan_jobs(domain, run_time, batches):
+    domains = list(jobs) if domain == "all" else [domain]
+    if batches == 1:
+        return [(name, run_time) for name in domains]
+    return [(name, f"{run_time}_{i}") for name in domains for i in range(batches)]
+
+
+def run_simulation(domain, chunk_size=None, workers=1, batches=None, seed=None, fmt="ndjson"):
+    if domain not in ("all", "fleet") and domain not in jobs:
+        logger.error("❌ Unknown domain: %s. Choose from: %s", domain, list(jobs.keys()) + ["all", "fleet"])
+        return []
 
-def run_simulation(domain):
     now = datetime.now()
     date_folder = f"{now.year}/{now.month:02d}/{now.day:02d}"
     run_time = now.strftime("%H-%M-%S")
     base_folder = os.path.join("data_simulator", "landing", date_folder)
 
+    import numpy as np
+    from devops.terraform.utils.blob_initializer import initialize_blob_folders
+
     os.makedirs(base_folder, exist_ok=True)
     initialize_blob_folders()
 
-    if domain == "all":
-        for name, generator in jobs.items():
-            print(f"\n🚀 Generating data for: {name}")
-            df = generator()
-            save_and_upload(name, df, run_time, base_folder)
-    elif domain in jobs:
-        print(f"\n🚀 Generating data for: {domain}")
-        for i in range(5):
-         df = jobs[domain]()
-         timestamped_run = f"{run_time}_{i}"
-         save_and_upload(domain, df, timestamped_run, base_folder)
+    # A single domain keeps its historical five batches per run
+    if batches is None:
+        batches = 1 if domain in ("all", "fleet") else 5
+    planned = plan_jobs(domain, run_time, batches)
+
+    # Each job gets an independent child seed, so a run is reproducible for a given --seed
+    seed_seq = np.random.SeedSequence(seed)
+    logger.info("🎲 Base seed: %s", seed_seq.entropy)
+    seeds = [int(child.generate_state(1)[0]) for child in seed_seq.spawn(len(planned))]
+
+    start = time.perf_counter()
+    if workers > 1:
+        level = logging.getLevelName(logging.getLogger().level)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(level,)) as pool:
+            futures = [
+                pool.submit(run_job, name, run_name, base_folder, chunk_size, job_seed, fmt)
+                for (name, run_name), job_seed in zip(planned, seeds)
+            ]
+            results = [future.result() for future in futures]
     else:
-        print(f"❌ Unknown domain: {domain}. Choose from: {list(jobs.keys()) + ['all']}")
+        results = [
+            run_job(name, run_name, base_folder, chunk_size, job_seed, fmt)
+            for (name, run_name), job_seed in zip(planned, seeds)
+        ]
+    elapsed = time.perf_counter() - start
+    for result in results:
+        metrics.merge(result.pop("metrics"))
+
+    logger.info(
+        "⏱️ Job timings:\n%s",
+        "\n".join(
+            f"   {result['domain']:<14} {result['run']:<14} {result['rows']:>10} rows  {result['seconds']:.2f}s"
+            for result in results
+        ),
+    )
+    logger.info("⏱️ Where the time went (summed across jobs):\n%s", metrics.summary())
+    total_rows = sum(result["rows"] for result in results)
+    logger.info(
+        "📈 %d rows in %.2fs across %d worker(s): %s rows/sec",
+        total_rows,
+        elapsed,
+        workers,
+        f"{total_rows / elapsed:,.0f}",
+    )
+    return results
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Simulate and upload domain data.")
-    parser.add_argument("--domain", required=True, help="Domain to simulate (e.g. telemetry, maintenance, all)")
+    parser.add_argument("--domain", required=True, help="Domain to simulate (e.g. telemetry, maintenance, all, fleet)")
+    parser.add_argument(
+        "--chunk-size", type=int, default=None, help="Stream generation in chunks of this many rows to bound memory"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Number of worker processes to fan domain/batch jobs out to"
+    )
+    parser.add_argument(
+        "--batches", type=int, default=None, help="Batches per domain (default: 5 for a single domain, 1 for all)"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Base seed; per-job seeds are derived from it for reproducible runs"
+    )
+    parser.add_argument(
+        "--format", choices=list(FORMATS), default="ndjson", help="Landing file format (parquet needs pyarrow)"
+    )
+    parser.add_argument(
+        "--log-level",
+        default=None,
+        help="Logging level, e.g. DEBUG for per-file upload lines (default: $RAILSIGHT_LOG_LEVEL or INFO)",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        default=None,
+        help="Export timings and counters here: *.prom for Prometheus text, otherwise JSON lines",
+    )
     args = parser.parse_args()
-    run_simulation(args.domain)
-#     print(f"❌ Unknown domain: {args.domain}. Choose from: {list(jobs.keys()) + ['all']}")
-#     run_simulation(args.domain)
\ No newline at end of file
+    configure_logging(args.log_level)
+    run_simulation(
+        args.domain,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        batches=args.batches,
+        seed=args.seed,
+        fmt=args.format,
+    )
+    metrics.export(args.metrics_out)